@@ -9,86 +9,442 @@ class BLA(object):
             2. y1 = y co-ordinate of first point
             3. x2 = x co-ordinate of second point
             4. y2 = y co-ordinate of second point
+            5. clip = viewport (xmin, ymin, xmax, ymax) to give only
+                      the pixels inside of, or None for all of them
     '''
-    def __init__(self, x1:int, y1:int, x2:int, y2:int) -> None:
+    def __init__(self, x1:int, y1:int, x2:int, y2:int,
+                 clip:tuple = None) -> None:
         super().__init__()
         self._x1 = x1
         self._y1 = y1
         self._x2 = x2
         self._y2 = y2
+        self._clip = clip
 
         self._dx = x2 - x1
         self._dy = y2 - y1
 
         self._x_inc_sign = 1 if x2 > x1 else -1
         self._y_inc_sign = 1 if y2 > y1 else -1
+        # Runs are rows of pixels if set, else columns.
+        self.horizontal = abs(self._dy) < abs(self._dx)
 
         self._pixel_set = []
 
-    def _getPixLow(self) -> list[int, int, int]:
-        '''This function finds the pixel locations which approximate
-           the line having slope between -1 and 1.
+    def _iterLow(self, x1:int, y1:int, x2:int, y2:int, first:int = 0,
+                 last:int = None):
+        '''This function yields the pixel locations which approximate
+           the line having slope between -1 and 1, going from
+           (x1, y1) to (x2, y2) with x1 <= x2. Only the steps from
+           first to last are taken, starting with y and p found
+           directly as in BLABatch.
 
            ⦿ Output:
-                1. a list of tuples containing x position, y position
-                   and decider variable p for each pixel.          
+                1. tuples containing x position, y position and
+                   decider variable p for each pixel.
         '''
-        self._dy = self._dy * self._y_inc_sign
-        p = 2*self._dy - self._dx
-        y = self._y1
-        for x in range(self._x1, self._x2 + 1):
-            self._pixel_set.append((x, y, p))
+        y_inc_sign = 1 if y2 > y1 else -1
+        dx = x2 - x1
+        dy = (y2 - y1) * y_inc_sign
+        steps = max((2*dy*first + dx - 1) // max(2*dx, 1), 0)
+        p = 2*dy*(first + 1) - dx - 2*dx*steps
+        y = y1 + y_inc_sign*steps
+        for x in range(x1 + first, x2 + 1 if last is None else x1 + last + 1):
+            yield (x, y, p)
             if p > 0:
-                y += self._y_inc_sign
-                p += 2 * (self._dy - self._dx)
+                y += y_inc_sign
+                p += 2 * (dy - dx)
             else:
-                p += 2*self._dy
-        return self._pixel_set
+                p += 2*dy
 
-    def _getPixHigh(self) -> list[int, int, int]:
-        '''This function finds the pixel locations which approximate
+    def _iterHigh(self, x1:int, y1:int, x2:int, y2:int, first:int = 0,
+                  last:int = None):
+        '''This function yields the pixel locations which approximate
            the line having slope either less than equal to -1 or
-           greater than equal to 1.
+           greater than equal to 1, going from (x1, y1) to (x2, y2)
+           with y1 <= y2. Only the steps from first to last are taken,
+           starting with x and p found directly as in BLABatch.
 
            ⦿ Output:
-                1. a list of tuples containing x position, y position
-                   and decider variable p for each pixel.          
+                1. tuples containing x position, y position and
+                   decider variable p for each pixel.
         '''
-        self._dx = self._dx * self._x_inc_sign
-        p = 2*self._dx - self._dy
-        x = self._x1
-        for y in range(self._y1, self._y2 + 1):
-            self._pixel_set.append((x, y, p))
+        x_inc_sign = 1 if x2 > x1 else -1
+        dx = (x2 - x1) * x_inc_sign
+        dy = y2 - y1
+        steps = max((2*dx*first + dy - 1) // max(2*dy, 1), 0)
+        p = 2*dx*(first + 1) - dy - 2*dy*steps
+        x = x1 + x_inc_sign*steps
+        for y in range(y1 + first, y2 + 1 if last is None else y1 + last + 1):
+            yield (x, y, p)
             if p > 0:
-                x += self._x_inc_sign
-                p += 2 * (self._dx - self._dy)
+                x += x_inc_sign
+                p += 2 * (dx - dy)
             else:
-                p += 2*self._dx
-        return self._pixel_set
+                p += 2*dx
+
+    def _minorSteps(self) -> tuple[int, int, int]:
+        '''This function finds the lengths of the line along its major
+           axis, b, and its minor axis, a, and the sign of the steps
+           along the minor axis, from the end points given by _ends().
+        '''
+        x1, y1, x2, y2 = self._ends()
+        if self.horizontal:
+            b, minor = x2 - x1, y2 - y1
+        else:
+            b, minor = y2 - y1, x2 - x1
+        return b, abs(minor), 1 if minor > 0 else -1
+
+    def decider(self, i:int) -> int:
+        '''This function finds the decider variable p of the i-th
+           pixel from the end point the line is drawn from directly,
+           as in BLABatch, for the runs which do not keep it.
+        '''
+        b, a, sign = self._minorSteps()
+        steps = max((2*a*i + b - 1) // max(2*b, 1), 0)
+        return 2*a*(i + 1) - b - 2*b*steps
+
+    def iterRuns(self):
+        '''This function yields the runs of pixels sharing a row, or a
+           column for steep lines, one run per step along the minor
+           axis. The run of the k-th step starts at the first pixel i
+           with (2*a*i + b - 1) // (2*b) >= k, that is at
+           ceil((2*b*k - b + 1) / (2*a)), so each run takes a division
+           instead of a loop over its pixels. The i-th pixel of the
+           line is the one whose major co-ordinate is i past that of
+           the first end point, and decider(i) gives its p.
+
+           ⦿ Output:
+                1. tuples (start, length, line) of the major co-ordinate
+                   of the first pixel of a run, the number of its pixels
+                   and its row, or column if the line is steep, in the
+                   order BLA draws them.
+        '''
+        steps = self._steps()
+        if not steps:
+            return
+        first, last = steps.start, steps.stop - 1
+        x1, y1, x2, y2 = self._ends()
+        major, minor = (x1, y1) if self.horizontal else (y1, x1)
+        b, a, sign = self._minorSteps()
+        if a == 0:
+            yield major + first, last - first + 1, minor
+            return
+
+        k = max((2*a*first + b - 1) // (2*b), 0)
+        start = first
+        numerator = 2*b*(k + 1) - b + 1
+        while start <= last:
+            stop = min(-(-numerator // (2*a)), last + 1)
+            yield major + start, stop - start, minor + sign*k
+            start = stop
+            numerator += 2*b
+            k += 1
+
+    def getRuns(self) -> list[int, int, int]:
+        '''This function finds the runs of pixels of the line, which
+           need as much memory as the steps along its minor axis rather
+           than as its pixels.
+
+           ⦿ Output:
+                1. a list of tuples (start, length, line) as given by
+                   iterRuns().
+        '''
+        return list(self.iterRuns())
+
+    def _ends(self) -> tuple[int, int, int, int]:
+        '''This function orders the end points the way BLA draws the
+           line, from the one with the smaller major co-ordinate.
+        '''
+        if abs(self._dy) < abs(self._dx):
+            if self._x1 > self._x2:
+                return self._x2, self._y2, self._x1, self._y1
+        elif self._y1 > self._y2:
+            return self._x2, self._y2, self._x1, self._y1
+        return self._x1, self._y1, self._x2, self._y2
+
+    def _pixelAt(self, i:int) -> tuple[int, int]:
+        x1, y1, x2, y2 = self._ends()
+        if abs(self._dy) < abs(self._dx):
+            x, y = next(self._iterLow(x1, y1, x2, y2, i, i))[:2]
+        else:
+            x, y = next(self._iterHigh(x1, y1, x2, y2, i, i))[:2]
+        return x, y
+
+    def _steps(self) -> range:
+        '''This function finds the steps of the line which are drawn,
+           all of them unless clipped. Liang–Barsky gives the steps
+           near the viewport, and the few at its ends which round out
+           of it are dropped by finding their pixels directly.
+        '''
+        n = max(abs(self._dx), abs(self._dy))
+        if self._clip is None:
+            return range(n + 1)
+
+        from algo.clip import clipSteps, inside
+        steps = clipSteps(*self._ends(), n, self._clip)
+        first = steps.start
+        last = steps.stop - 1
+        while first <= last and not inside(*self._pixelAt(first),
+                                           self._clip):
+            first += 1
+        while first <= last and not inside(*self._pixelAt(last),
+                                           self._clip):
+            last -= 1
+        return range(first, last + 1)
+
+    def __len__(self) -> int:
+        return len(self._steps())
+
+    def __iter__(self):
+        '''This function yields the pixel locations which approximate
+           lines of all the slopes one at a time using the functions
+           _iterHigh() and _iterLow(), always starting from the end
+           point with the smaller major co-ordinate.
+        '''
+        steps = self._steps()
+        if not steps:
+            return iter(())
+        if abs(self._dy) < abs(self._dx):
+            return self._iterLow(*self._ends(), steps.start, steps.stop - 1)
+        return self._iterHigh(*self._ends(), steps.start, steps.stop - 1)
 
     def getPixels(self) -> list[int, int, int]:
         '''This function finds the pixel locations which approximate
-           lines of all the slopes using the functions
-           _getPixHigh() and _getPixLow().
+           lines of all the slopes.
 
            ⦿ Output:
                 1. a list of tuples containing x position, y position
                    and decider variable p for each pixel.  
         '''
-        if abs(self._dy) < abs(self._dx):
-            if self._x1 > self._x2:
-                bla = BLA(self._x2, self._y2, self._x1, self._y1)
-                return bla._getPixLow()
-            else:
-                bla = BLA(self._x1, self._y1, self._x2, self._y2)
-                return bla._getPixLow()
+        self._pixel_set = list(self)
+        return self._pixel_set
+
+    def getTrace(self):
+        '''This function finds the same pixel locations as getPixels()
+           but stores them compactly.
+
+           ⦿ Output:
+                1. a PixelTrace with fields x, y and p.
+        '''
+        from algo.trace import PixelTrace
+        return PixelTrace('iiq', self)
+
+
+class DoubleStepBLA(BLA):
+    '''Bresenham's line algorithm drawing the line from both of its end
+       points towards the middle, two pixels at a time from each, after
+       the double-step algorithm of Wu and Rokne. Each step takes the
+       pattern of the next two pixels from either end, flat-flat,
+       flat-up, up-flat or up-up, so a step gives four pixels in all.
+       A line of a slope up to 1/2 never goes up twice in a row and a
+       steeper one never goes flat twice, so each end chooses between
+       three patterns by comparing its decider, updated once per
+       pattern, with two thresholds.
+       The pixels are the same as those of BLA. BLA steps after pixel i
+       when p > 0, rounding ties along the minor axis down from its
+       first end point, so the end walking back steps when its own
+       decider q >= 0 instead, which is BLA rounded from the other end.
+       The p given for the pixels of that end is that of BLA too, found
+       as 4*a - 2*b - q.
+
+       ⦿ Input:
+            the same as those of BLA
+    '''
+    # Pixels drawn by a step, the last step drawing those left.
+    STEP = 4
+
+    def iterSteps(self):
+        '''This function yields the pixels of each step, the two next
+           ones from the first end point followed by the two next ones
+           from the last, until fewer than STEP are left, which the last
+           step draws from the first end point.
+
+           ⦿ Output:
+                1. tuples of up to STEP tuples containing x position,
+                   y position and decider variable p of BLA.
+        '''
+        steps = self._steps()
+        if not steps:
+            return
+        x1, y1, x2, y2 = self._ends()
+        b, a, sign = self._minorSteps()
+        horizontal = self.horizontal
+        if horizontal:
+            major1, minor1, major2, minor2 = x1, y1, x2, y2
         else:
-            if self._y1 > self._y2:
-                bla = BLA(self._x2, self._y2, self._x1, self._y1)
-                return bla._getPixHigh()
+            major1, minor1, major2, minor2 = y1, x1, y2, x2
+
+        # Pixel i from the first end point, s steps along the minor axis
+        # from it, and pixel j from the last one, t steps back from it.
+        i = steps.start
+        s = max((2*a*i + b - 1) // max(2*b, 1), 0)
+        p = 2*a*(i + 1) - b - 2*b*s
+        j = b - (steps.stop - 1)
+        t = (2*a*j + b) // max(2*b, 1)
+        q = 2*a*(j + 1) - b - 2*b*t
+
+        flat = 2*a
+        up = 2*a - 2*b
+        mirror = 4*a - 2*b
+        # Patterns of the next two pixels, as the steps along the minor
+        # axis to the first and to the second of them, the change of the
+        # decider to the first of them and to the pixel after them.
+        flat_flat = (0, 0, flat, 2*flat)
+        flat_up = (0, sign, flat, flat + up)
+        up_flat = (sign, sign, up, up + flat)
+        up_up = (sign, 2*sign, up, 2*up)
+        # The decider before two pixels goes flat-flat up to -flat,
+        # flat-up up to 0, up-flat up to -up and up-up past that, ties
+        # going to the lower pattern from the first end point and to the
+        # upper one from the last.
+        if 2*a > b:
+            high, low = -up, 0
+            high_pattern, middle, low_pattern = up_up, up_flat, flat_up
+        else:
+            high, low = 0, -flat
+            high_pattern, middle, low_pattern = up_flat, flat_up, flat_flat
+
+        front = major1 + i
+        back = major2 - j
+        minor_front = minor1 + sign*s
+        minor_back = minor2 - sign*t
+        while back - front + 1 >= self.STEP:
+            if p > high:
+                to_front2, to_front, dp2, dp = high_pattern
+            elif p > low:
+                to_front2, to_front, dp2, dp = middle
+            else:
+                to_front2, to_front, dp2, dp = low_pattern
+            if q >= high:
+                to_back2, to_back, dq2, dq = high_pattern
+            elif q >= low:
+                to_back2, to_back, dq2, dq = middle
+            else:
+                to_back2, to_back, dq2, dq = low_pattern
+            minor_front2 = minor_front + to_front2
+            minor_back2 = minor_back - to_back2
+            p2 = p + dp2
+            q2 = q + dq2
+
+            if horizontal:
+                yield ((front, minor_front, p),
+                       (front + 1, minor_front2, p2),
+                       (back, minor_back, mirror - q),
+                       (back - 1, minor_back2, mirror - q2))
+            else:
+                yield ((minor_front, front, p),
+                       (minor_front2, front + 1, p2),
+                       (minor_back, back, mirror - q),
+                       (minor_back2, back - 1, mirror - q2))
+
+            p += dp
+            q += dq
+            minor_front += to_front
+            minor_back -= to_back
+            front += 2
+            back -= 2
+
+        last = []
+        for major in range(front, back + 1):
+            if horizontal:
+                last.append((major, minor_front, p))
+            else:
+                last.append((minor_front, major, p))
+            if p > 0:
+                minor_front += sign
+                p += up
             else:
-                bla = BLA(self._x1, self._y1, self._x2, self._y2)
-                return bla._getPixHigh()
+                p += flat
+        if last:
+            yield tuple(last)
+
+    def getSteps(self) -> list:
+        '''This function finds the pixels of each step.
+
+           ⦿ Output:
+                1. a list of tuples of the pixels of each step, as given
+                   by iterSteps().
+        '''
+        return list(self.iterSteps())
+
+    def __iter__(self):
+        '''This function yields the pixel locations one at a time in the
+           order of the steps, so getPixels() and getTrace() give them in
+           that order too.
+        '''
+        for step in self.iterSteps():
+            yield from step
+
+
+class BLABatch(object):
+    '''Bresenham's line algorithm for many lines at once using NumPy.
+       Every line is taken from the end point BLA would start from, and
+       the number of steps taken along the minor axis before the i-th
+       pixel is found directly as floor((2*a*i + b - 1) / (2*b)), where
+       b is the length along the major axis and a along the minor one.
+       The decider p of that pixel then follows as
+       2*a*(i + 1) - b - 2*b*steps, so pixels and p are the same as
+       those of BLA without iterating over them.
+
+       ⦿ Input:
+            1. lines = array of shape (N, 4) having x1, y1, x2 and y2
+                       of each line as a row
+    '''
+    PIXEL_DTYPE = [('x', 'i8'), ('y', 'i8'), ('p', 'i8'), ('segment', 'i8')]
+
+    def __init__(self, lines) -> None:
+        super().__init__()
+        import numpy as np
+        lines = np.asarray(lines, dtype=np.int64).reshape(-1, 4)
+        x1, y1, x2, y2 = lines.T
+
+        self._low = np.abs(y2 - y1) < np.abs(x2 - x1)
+        swap = np.where(self._low, x1 > x2, y1 > y2)
+        self._x1 = np.where(swap, x2, x1)
+        self._y1 = np.where(swap, y2, y1)
+        self._x2 = np.where(swap, x1, x2)
+        self._y2 = np.where(swap, y1, y2)
+
+    def getPixels(self):
+        '''This function finds the pixel locations of all the lines.
+           Each line has max(|dx|, |dy|) + 1 pixels, so the result is
+           allocated once at its final size.
+
+           ⦿ Output:
+                1. a structured array with fields x, y, p and segment
+                   for each pixel, segment being the index of the line
+                   in the input. Pixels of a line are contiguous and in
+                   the order BLA gives them.
+        '''
+        import numpy as np
+        low = self._low
+        major_start = np.where(low, self._x1, self._y1)
+        minor_start = np.where(low, self._y1, self._x1)
+        b = np.where(low, self._x2 - self._x1, self._y2 - self._y1)
+        minor_d = np.where(low, self._y2 - self._y1, self._x2 - self._x1)
+        minor_sign = np.where(minor_d > 0, 1, -1)
+        a = np.abs(minor_d)
+
+        count = b + 1
+        offsets = np.zeros(len(count) + 1, dtype=np.int64)
+        np.cumsum(count, out=offsets[1:])
+        pixels = np.empty(offsets[-1], dtype=self.PIXEL_DTYPE)
+
+        segment = np.repeat(np.arange(len(count)), count)
+        i = np.arange(offsets[-1]) - offsets[segment]
+        a = a[segment]
+        b = b[segment]
+        steps = np.maximum((2*a*i + b - 1) // np.maximum(2*b, 1), 0)
+
+        major = major_start[segment] + i
+        minor = minor_start[segment] + minor_sign[segment] * steps
+        low = low[segment]
+        pixels['x'] = np.where(low, major, minor)
+        pixels['y'] = np.where(low, minor, major)
+        pixels['p'] = 2*a*(i + 1) - b - 2*b*steps
+        pixels['segment'] = segment
+        return pixels
 
 
 if __name__ == '__main__':
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+
+from algo.bla import BLA, DoubleStepBLA
+from algo.clip import boxInside
+from algo.dda import DDA, FixedDDA
+from algo.circle import Circle
+from algo.ellipse import Ellipse
+
+
+class ShapeCache(object):
+    '''Least recently used cache of the pixels of shapes. A circle of
+       radius r, an ellipse with axes (a, b) or a BLA line, of either
+       BLA or DoubleStepBLA, with a given delta (which also fixes its
+       octant) has the same pixels wherever it is drawn, so they are
+       stored relative to the origin once and moved to the requested
+       position when read.
+       DDA accumulates floats starting from x1 and y1, which rounds
+       differently at different positions, and FixedDDA rounds ties to
+       even, so DDA and FixedDDA lines are stored with their position.
+       A shape sticking out of the viewport is stored clipped, along
+       with where the viewport lies relative to it.
+
+       ⦿ Input:
+            1. max_bytes = memory the stored pixels may take before
+                           the least recently used shapes are dropped
+    '''
+    def __init__(self, max_bytes:int) -> None:
+        super().__init__()
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _relativeClip(self, clip:tuple, box:tuple, dx:int, dy:int):
+        '''This function moves the viewport by the offset a shape is
+           stored at.
+
+           ⦿ Output:
+                1. the moved viewport, or None if the bounding box of
+                   the stored shape lies inside it.
+        '''
+        if clip is None:
+            return None
+        clip = (clip[0] - dx, clip[1] - dy, clip[2] - dx, clip[3] - dy)
+        return None if boxInside(box, clip) else clip
+
+    def _normalize(self, algorithm:str, args:tuple, clip:tuple) -> tuple:
+        '''This function splits a shape into the key of its pixels
+           relative to the origin, the class computing them and the
+           offset to move them by.
+        '''
+        if algorithm in ('DDA', 'FixedDDA'):
+            x1, y1, x2, y2 = args
+            clip = self._relativeClip(clip, (min(x1, x2), min(y1, y2),
+                                             max(x1, x2), max(y1, y2)), 0, 0)
+            algoclass = DDA if algorithm == 'DDA' else FixedDDA
+            return ((algorithm, *args, clip), algoclass(*args, clip=clip),
+                    (0, 0))
+        elif algorithm in ('BLA', 'BLA2'):
+            x1, y1, x2, y2 = args
+            dx = x2 - x1
+            dy = y2 - y1
+            clip = self._relativeClip(clip, (min(dx, 0), min(dy, 0),
+                                             max(dx, 0), max(dy, 0)), x1, y1)
+            algoclass = BLA if algorithm == 'BLA' else DoubleStepBLA
+            return ((algorithm, dx, dy, clip),
+                    algoclass(0, 0, dx, dy, clip=clip), (x1, y1))
+        elif algorithm == 'circle':
+            x, y, r = args
+            clip = self._relativeClip(clip, (-r, -r, r, r), x, y)
+            return ('circle', r, clip), Circle(0, 0, r, clip=clip), (x, y)
+        elif algorithm == 'ellipse':
+            x, y, a, b = args
+            clip = self._relativeClip(clip, (-a, -b, a, b), x, y)
+            return (('ellipse', a, b, clip), Ellipse(0, 0, a, b, clip=clip),
+                    (x, y))
+        raise ValueError(f'unknown algorithm {algorithm!r}')
+
+    def get(self, algorithm:str, *args, clip:tuple = None):
+        '''This function gives the pixels of a shape, computing them
+           only if the same shape is not cached at any position.
+
+           ⦿ Input:
+                1. algorithm = 'DDA', 'FixedDDA', 'BLA', 'BLA2'
+                               (DoubleStepBLA), 'circle' or 'ellipse'
+                2. args      = arguments of the class of the algorithm
+                3. clip      = viewport (xmin, ymin, xmax, ymax) to give
+                               only the pixels inside of
+
+           ⦿ Output:
+                1. a ShiftedTrace having the same steps as getPixels()
+                   of the class of the algorithm.
+        '''
+        key, algoclass, (dx, dy) = self._normalize(algorithm, args, clip)
+        trace = self._entries.get(key)
+        if trace is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            trace = algoclass.getTrace()
+            self._entries[key] = trace
+            self.nbytes += trace.nbytes
+            while self.nbytes > self._max_bytes and self._entries:
+                self.nbytes -= self._entries.popitem(last=False)[1].nbytes
+        return trace.shifted(dx, dy)
+
+    def peek(self, algorithm:str, *args, clip:tuple = None):
+        '''This function gives the pixels of a shape like get(), but
+           only if they are cached, so that a shape drawn for the first
+           time can be drawn lazily from its algorithm instead.
+
+           ⦿ Output:
+                1. a ShiftedTrace, or None if the shape is not cached.
+        '''
+        key, algoclass, (dx, dy) = self._normalize(algorithm, args, clip)
+        trace = self._entries.get(key)
+        if trace is None:
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return trace.shifted(dx, dy)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,24 +1,135 @@
+from math import isqrt
+
+
 class Circle(object):
-    def __init__(self, x:int, y:int, r:int) -> None:
+    # Signs and swap of the offsets (x, y) of the first octant for
+    # each of the eight symmetric pixels, in the order they are given.
+    MIRRORS = ((1, 1, False), (-1, 1, False), (1, -1, False), (-1, -1, False),
+               (1, 1, True), (-1, 1, True), (1, -1, True), (-1, -1, True))
+
+    def __init__(self, x:int, y:int, r:int, clip:tuple = None) -> None:
         super().__init__()
         self._x = x
         self._y = y
         self._r = r
+        self._clip = clip
         self._pixel_set = []
 
-    def getPixels(self) -> list[int, int, int]:
+    def _octantY(self, x:int) -> int:
+        '''This function finds y of the pixel which the midpoint
+           algorithm picks in column x of the first octant. The
+           midpoint (x, y - 1/2) lies inside the circle and
+           (x, y + 1/2) does not, so 2y - 1 is the largest odd number
+           whose square is less than 4(r² - x²).
+        '''
+        n = 4 * (self._r*self._r - x*x)
+        if n <= 0:
+            return 0
+        return (isqrt(n - 1) + 1) // 2
+
+    def _octantLength(self) -> int:
+        '''Eight pixels are produced for every column x of the first
+           octant having x < y, so the first column where x >= y is
+           searched for.
+        '''
+        lo = 0
+        hi = self._r
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid >= self._octantY(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _lastColumn(self, v:int, n:int) -> int:
+        '''This function finds the last of the first n columns of the
+           octant whose y is at least v, or -1 if there is none. For
+           v > 0, y >= v holds while 4(r² - x²) - 1 >= (2v - 1)², as
+           in _octantY(), so the column is found by isqrt as well.
+        '''
+        if v <= 0:
+            return n - 1
+        t = 4*self._r*self._r - (2*v - 1)**2 - 1
+        if t < 0:
+            return -1
+        return min(isqrt(t // 4), n - 1)
+
+    def _visible(self) -> list:
+        '''This function finds, for each of the eight mirrors, the
+           columns of the first octant whose pixel lies in the
+           viewport. Along the octant x grows and y shrinks, so the
+           columns keeping each co-ordinate of a mirrored pixel in the
+           viewport are a range, found directly from the bounds of the
+           viewport around the centre.
+
+           ⦿ Output:
+                1. a list of eight ranges of columns.
+        '''
+        from algo.clip import intersect
+        xmin, ymin, xmax, ymax = self._clip
+        n = self._octantLength()
+        ranges = []
+        for sx, sy, swap in self.MIRRORS:
+            # Bounds of the offsets from the centre along x and y.
+            bx = (xmin - self._x, xmax - self._x) if sx > 0 else \
+                 (self._x - xmax, self._x - xmin)
+            by = (ymin - self._y, ymax - self._y) if sy > 0 else \
+                 (self._y - ymax, self._y - ymin)
+            (klo, khi), (ylo, yhi) = (by, bx) if swap else (bx, by)
+            ranges.append(intersect(
+                range(max(klo, 0), max(min(khi + 1, n), 0)),
+                range(self._lastColumn(yhi + 1, n) + 1,
+                      self._lastColumn(ylo, n) + 1)))
+        return ranges
+
+    def __len__(self) -> int:
+        if self._clip is not None:
+            return sum(len(r) for r in self._visible())
+        return 8 * self._octantLength()
+
+    def _iterClipped(self):
+        '''This function yields the pixels lying in the viewport. The
+           columns of the octant visible in no mirror are skipped, by
+           starting each run of visible columns with y from _octantY()
+           and p = (x + 1)² + (y - 1/2)² - r², the value the decider of
+           __iter__() has in that column.
+        '''
+        from algo.clip import segments
+        r = self._r
+        for columns, mirrors in segments(self._visible()):
+            mirrors = [self.MIRRORS[m] for m in mirrors]
+            y = self._octantY(columns.start)
+            p = (4*(columns.start + 1)**2 + (2*y - 1)**2 - 4*r*r) / 4
+            for x in columns:
+                for sx, sy, swap in mirrors:
+                    if swap:
+                        yield (self._x + sx*y, self._y + sy*x, p)
+                    else:
+                        yield (self._x + sx*x, self._y + sy*y, p)
+                if p < 0:
+                    p = p + 2*(x + 1) + 1
+                else:
+                    y = y - 1
+                    p = p + 2*(x + 1 - y) + 1
+
+    def __iter__(self):
+        if self._clip is not None:
+            yield from self._iterClipped()
+            return
+
         x = 0
         y = self._r
         p = 5/4 - self._r
         while x < y:
-            self._pixel_set.append((self._x + x, self._y + y, p))
-            self._pixel_set.append((self._x - x, self._y + y, p))
-            self._pixel_set.append((self._x + x, self._y - y, p))
-            self._pixel_set.append((self._x - x, self._y - y, p))
-            self._pixel_set.append((self._x + y, self._y + x, p))
-            self._pixel_set.append((self._x - y, self._y + x, p))
-            self._pixel_set.append((self._x + y, self._y - x, p))
-            self._pixel_set.append((self._x - y, self._y - x, p))
+            yield (self._x + x, self._y + y, p)
+            yield (self._x - x, self._y + y, p)
+            yield (self._x + x, self._y - y, p)
+            yield (self._x - x, self._y - y, p)
+            yield (self._x + y, self._y + x, p)
+            yield (self._x - y, self._y + x, p)
+            yield (self._x + y, self._y - x, p)
+            yield (self._x - y, self._y - x, p)
             if p < 0:
                 x = x + 1
                 p = p + 2*x + 1
@@ -26,8 +137,99 @@ class Circle(object):
                 x = x + 1
                 y = y - 1
                 p = p + 2*(x - y) + 1
+
+    def getPixels(self) -> list[int, int, int]:
+        self._pixel_set = list(self)
         return self._pixel_set
 
+    def getTrace(self):
+        from algo.trace import PixelTrace
+        return PixelTrace('iid', self)
+
+
+class OctantCircle(object):
+    '''Mid-point circle drawing algorithm using only integers, which
+       stores the pixels of the first octant alone. The other seven
+       octants are mirrored from it only when they are visited, in the
+       same order as Circle gives them.
+       The decider starts at 1 - r instead of 5/4 - r. As all of its
+       updates are integers, it is negative exactly when the one of
+       Circle is, so both pick the same pixels.
+
+       ⦿ Input:
+            1. x = x co-ordinate of centre
+            2. y = y co-ordinate of centre
+            3. r = radius
+    '''
+    MIRRORS = Circle.MIRRORS
+
+    def __init__(self, x:int, y:int, r:int) -> None:
+        super().__init__()
+        self._x = x
+        self._y = y
+        self._r = r
+        self._octant = None
+
+    def _iterOctant(self):
+        x = 0
+        y = self._r
+        p = 1 - self._r
+        while x < y:
+            yield (x, y, p)
+            if p < 0:
+                x = x + 1
+                p = p + 2*x + 1
+            else:
+                x = x + 1
+                y = y - 1
+                p = p + 2*(x - y) + 1
+
+    def getOctant(self):
+        '''This function finds the pixels of the first octant relative
+           to the centre, computing them on the first call only.
+
+           ⦿ Output:
+                1. a PixelTrace with fields x, y and p.
+        '''
+        if self._octant is None:
+            from algo.trace import PixelTrace
+            self._octant = PixelTrace('iiq', self._iterOctant())
+        return self._octant
+
+    def _mirror(self, x:int, y:int, m:int) -> tuple[int, int]:
+        sx, sy, swap = self.MIRRORS[m]
+        if swap:
+            return self._x + sx*y, self._y + sy*x
+        return self._x + sx*x, self._y + sy*y
+
+    def __len__(self) -> int:
+        return 8 * len(self.getOctant())
+
+    def __getitem__(self, k:int) -> tuple[int, int, int]:
+        if k < 0:
+            k += len(self)
+        x, y, p = self.getOctant()[k // 8]
+        return (*self._mirror(x, y, k % 8), p)
+
+    def __iter__(self):
+        for x, y, p in self.getOctant():
+            for m in range(8):
+                yield (*self._mirror(x, y, m), p)
+
+    def unique(self):
+        '''This function yields the pixels of the circle like
+           iterating over it does, but each pixel only once. The
+           octant never reaches the diagonal, so mirrored pixels only
+           coincide on the axes, where x is 0.
+
+           ⦿ Output:
+                1. tuples containing x position, y position and
+                   decider variable p for each pixel.
+        '''
+        for x, y, p in self.getOctant():
+            for m in ((0, 2, 4, 5) if x == 0 else range(8)):
+                yield (*self._mirror(x, y, m), p)
+
 
 if __name__ == '__main__':
     o = Circle(0, 0, 2)
@@ -0,0 +1,113 @@
+'''Clipping of shapes to a viewport. A viewport is a tuple
+   (xmin, ymin, xmax, ymax) of the first and the last visible column
+   and row, so both bounds are inclusive.
+'''
+
+
+def inside(x:int, y:int, clip:tuple) -> bool:
+    xmin, ymin, xmax, ymax = clip
+    return xmin <= x <= xmax and ymin <= y <= ymax
+
+
+def boxInside(box:tuple, clip:tuple) -> bool:
+    '''This function tells whether a bounding box, given like a
+       viewport, lies entirely in the viewport, when nothing needs to
+       be clipped.
+    '''
+    return (clip[0] <= box[0] and clip[1] <= box[1] and
+            box[2] <= clip[2] and box[3] <= clip[3])
+
+
+def boxOverlap(a:tuple, b:tuple) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def clipSteps(x1:int, y1:int, x2:int, y2:int, n:int, clip:tuple) -> range:
+    '''Liang–Barsky clipping of the segment from (x1, y1) to (x2, y2)
+       taken in n equal steps. A line algorithm draws each step at most
+       half a pixel away from the segment, so the viewport is grown by
+       half a pixel on every side, and the i-th step is kept when
+       p * i <= q for each side, where p and q are the terms of
+       Liang–Barsky for t = i / n, doubled to stay integers.
+
+       ⦿ Output:
+            1. the range of steps lying in the grown viewport. It holds
+               every step drawn in the viewport, and at most the ones
+               at its ends which round out of it besides.
+    '''
+    if n == 0:
+        return range(0, 1) if inside(x1, y1, clip) else range(0)
+
+    xmin, ymin, xmax, ymax = clip
+    dx = x2 - x1
+    dy = y2 - y1
+    first = 0
+    last = n
+    for p, q in ((-2*dx, (2*(x1 - xmin) + 1) * n),
+                 (2*dx, (2*(xmax - x1) + 1) * n),
+                 (-2*dy, (2*(y1 - ymin) + 1) * n),
+                 (2*dy, (2*(ymax - y1) + 1) * n)):
+        if p == 0:
+            if q < 0:
+                return range(0)
+        elif p < 0:
+            first = max(first, -(q // -p))
+        else:
+            last = min(last, q // p)
+    return range(first, max(first, last + 1))
+
+
+def monotoneSteps(f, n:int, lo:int, hi:int) -> range:
+    '''This function finds the steps k in range(n) for which lo <= f(k)
+       <= hi by binary search, f being monotone.
+
+       ⦿ Output:
+            1. a range of steps.
+    '''
+    if n <= 0:
+        return range(0)
+    if f(0) > f(n - 1):
+        return monotoneSteps(lambda k: -f(k), n, -hi, -lo)
+
+    first = 0
+    last = n
+    while first < last:
+        mid = (first + last) // 2
+        if f(mid) >= lo:
+            last = mid
+        else:
+            first = mid + 1
+
+    end = first
+    last = n
+    while end < last:
+        mid = (end + last) // 2
+        if f(mid) > hi:
+            last = mid
+        else:
+            end = mid + 1
+    return range(first, end)
+
+
+def intersect(a:range, b:range) -> range:
+    start = max(a.start, b.start)
+    return range(start, max(start, min(a.stop, b.stop)))
+
+
+def segments(ranges:list) -> list:
+    '''This function splits the steps covered by ranges, one for each
+       mirror of a shape, into runs of steps visible in the same
+       mirrors.
+
+       ⦿ Output:
+            1. a list of tuples of a range of steps and the indices of
+               the mirrors visible during those steps.
+    '''
+    bounds = sorted({b for r in ranges if r for b in (r.start, r.stop)})
+    runs = []
+    for start, stop in zip(bounds, bounds[1:]):
+        mirrors = tuple(m for m, r in enumerate(ranges)
+                        if r.start <= start and stop <= r.stop)
+        if mirrors:
+            runs.append((range(start, stop), mirrors))
+    return runs
\ No newline at end of file
@@ -1,3 +1,7 @@
+from collections import deque
+from itertools import accumulate, repeat
+
+
 class DDA(object):
     '''For generating any line segment we need intermediate points and
        for calculating them we can use a basic algorithm called DDA
@@ -9,13 +13,17 @@ class DDA(object):
             2. y1 = y co-ordinate of first point
             3. x2 = x co-ordinate of second point
             4. y2 = y co-ordinate of second point
+            5. clip = viewport (xmin, ymin, xmax, ymax) to give only
+                      the pixels inside of, or None for all of them
     '''
-    def __init__(self, x1:int, y1:int, x2:int, y2:int) -> None:
+    def __init__(self, x1:int, y1:int, x2:int, y2:int,
+                 clip:tuple = None) -> None:
         super().__init__()
         self._x1 = x1
         self._y1 = y1
         self._x2 = x2
         self._y2 = y2
+        self._clip = clip
 
         self._dx = abs(x2 - x1)
         self._dy = abs(y2 - y1)
@@ -25,6 +33,51 @@ class DDA(object):
 
         self._pixel_set = []
 
+    def __len__(self) -> int:
+        if self._clip is not None:
+            return sum(1 for pixel in self)
+        return max(self._dx, self._dy) + 1
+
+    def __iter__(self):
+        '''This function yields the pixel locations which approximate
+           lines by running through the longest directions step by step
+           and calculating the location of each pixel in the other
+           direction. Each location is computed only when asked for.
+           When clipped, only the steps Liang–Barsky finds near the
+           viewport are rounded and checked. The floats accumulated
+           before them are still added up, though without Python steps,
+           as starting from x1 + i*x_inc would round differently.
+
+           ⦿ Output:
+                1. tuples containing x position, y position as floats
+                   precise till 2 digits and their values rounded to
+                   nearest integers.
+        '''
+        step = max(self._dx, self._dy)
+        x_inc = self._dx / step if step else 0
+        y_inc = self._dy / step if step else 0
+        x = self._x1
+        y = self._y1
+        clip = self._clip
+        steps = range(step + 1)
+        if clip is not None:
+            from algo.clip import clipSteps, inside
+            steps = clipSteps(self._x1, self._y1, self._x2, self._y2, step,
+                              clip)
+            if steps:
+                steps = range(max(steps.start - 1, 0),
+                              min(steps.stop + 1, step + 1))
+            x = deque(accumulate(repeat(x_inc * self._x_inc_sign,
+                                        steps.start), initial=x), 1)[0]
+            y = deque(accumulate(repeat(y_inc * self._y_inc_sign,
+                                        steps.start), initial=y), 1)[0]
+
+        for i in steps:
+            if clip is None or inside(round(x), round(y), clip):
+                yield (round(x, 2), round(y, 2), round(x), round(y))
+            x += x_inc * self._x_inc_sign
+            y += y_inc * self._y_inc_sign
+
     def getPixels(self) -> list[int, int, int, int]:
         '''This function finds the pixel locations which approximate
            lines by running through the longest directions step by step
@@ -36,20 +89,202 @@ class DDA(object):
                    as floats precise till 2 digits and their values
                    rounded to nearest integers.  
         '''
+        self._pixel_set = list(self)
+        return self._pixel_set
+
+    def getTrace(self):
+        '''This function finds the same pixel locations as getPixels()
+           but stores them compactly.
+
+           ⦿ Output:
+                1. a PixelTrace with fields x, y, x-plot and y-plot.
+        '''
+        from algo.trace import PixelTrace
+        return PixelTrace('ddii', self)
+
+
+class FixedDDA(DDA):
+    '''DDA in fixed point, adding integers only. x and y of the i-th
+       step are x1 + i*dx/n and y1 + i*dy/n for the n steps of the line,
+       so they are kept exactly as integers scaled by n, which Python
+       holds at any size. Each step adds dx or dy to them and twice that
+       to the error of their rounded values, which moves the pixel on
+       as soon as the error passes half a pixel. Nothing is rounded, so
+       no error builds up however long the line is, and the pixels are
+       those of x and y rounded exactly, ties to even as round() does.
+       DDA may differ from them on such ties and on long lines, where
+       its floats drift.
+
+       ⦿ Input:
+            the same as those of DDA
+    '''
+    def __init__(self, x1:int, y1:int, x2:int, y2:int,
+                 clip:tuple = None) -> None:
+        super().__init__(x1, y1, x2, y2, clip)
+        # The steps of the line, which x and y are scaled by.
+        self.scale = max(self._dx, self._dy, 1)
+
+    def value(self, v:int) -> float:
+        '''This function turns x or y of a step into a float precise
+           till 2 digits, as DDA gives them, when it is shown.
+        '''
+        return round(v / self.scale, 2)
+
+    def _startAt(self, v1:int, d:int, sign:int, i:int) -> tuple:
+        '''This function finds the pixel of a co-ordinate at step i
+           and its error, twice its distance from the pixel along the
+           direction of the line, scaled.
+        '''
+        scale = self.scale
+        whole, part = divmod(i * d, scale)
+        plot = v1 + sign*whole
+        error = 2*part
+        if error > scale or (error == scale and (plot + sign) % 2 == 0):
+            plot += sign
+            error -= 2*scale
+        return plot, error
+
+    def __iter__(self):
+        '''This function yields the pixel locations which approximate
+           lines, like DDA, starting the clipped steps directly at the
+           first of them.
+
+           ⦿ Output:
+                1. tuples containing x position and y position scaled by
+                   the steps of the line, and their values rounded to
+                   nearest integers. value() gives x and y as DDA does.
+        '''
+        step = max(self._dx, self._dy)
+        scale = self.scale
+        clip = self._clip
+        steps = range(step + 1)
+        if clip is not None:
+            from algo.clip import clipSteps, inside
+            steps = clipSteps(self._x1, self._y1, self._x2, self._y2, step,
+                              clip)
+            if steps:
+                steps = range(max(steps.start - 1, 0),
+                              min(steps.stop + 1, step + 1))
+        if not steps:
+            return
+
+        x_sign, y_sign = self._x_inc_sign, self._y_inc_sign
+        x = self._x1*scale + x_sign*self._dx*steps.start
+        y = self._y1*scale + y_sign*self._dy*steps.start
+        x_inc, y_inc = x_sign*self._dx, y_sign*self._dy
+        x_plot, x_error = self._startAt(self._x1, self._dx, x_sign,
+                                        steps.start)
+        y_plot, y_error = self._startAt(self._y1, self._dy, y_sign,
+                                        steps.start)
+        two_scale = 2*scale
+
+        # Along the longer direction the pixel moves on every step.
         if self._dx >= self._dy:
-            step = self._dx
+            two_d = 2*self._dy
+            for i in steps:
+                if clip is None or inside(x_plot, y_plot, clip):
+                    yield (x, y, x_plot, y_plot)
+                x += x_inc
+                y += y_inc
+                x_plot += x_sign
+                y_error += two_d
+                if y_error >= scale and (y_error > scale or
+                                         (y_plot + y_sign) % 2 == 0):
+                    y_plot += y_sign
+                    y_error -= two_scale
         else:
-            step = self._dy
-        self._dx /= step
-        self._dy /= step
-        x = self._x1
-        y = self._y1
-        for i in range(step + 1):
-            self._pixel_set.append((round(x, 2), round(y, 2), 
-                                   round(x), round(y)))
-            x += self._dx * self._x_inc_sign
-            y += self._dy * self._y_inc_sign
-        return self._pixel_set
+            two_d = 2*self._dx
+            for i in steps:
+                if clip is None or inside(x_plot, y_plot, clip):
+                    yield (x, y, x_plot, y_plot)
+                x += x_inc
+                y += y_inc
+                y_plot += y_sign
+                x_error += two_d
+                if x_error >= scale and (x_error > scale or
+                                         (x_plot + x_sign) % 2 == 0):
+                    x_plot += x_sign
+                    x_error -= two_scale
+
+    def getTrace(self):
+        '''This function finds the same pixel locations as getPixels()
+           but stores them compactly.
+
+           ⦿ Output:
+                1. a PixelTrace with fields x, y, x-plot and y-plot.
+        '''
+        from algo.trace import PixelTrace
+        return PixelTrace('qqii', self)
+
+
+class DDABatch(object):
+    '''DDA for many lines at once using NumPy. The samples of all the
+       lines are computed together and returned as flat arrays, so the
+       cost of a Python loop per step or per line is avoided.
+       The increments are accumulated in the same order as DDA does,
+       so the plotted pixels match those of DDA exactly. The values
+       rounded till 2 digits may differ by 0.01 on a tie, as NumPy
+       rounds them differently than round().
+
+       ⦿ Input:
+            1. lines = array of shape (N, 4) having x1, y1, x2 and y2
+                       of each line as a row
+    '''
+    def __init__(self, lines) -> None:
+        super().__init__()
+        import numpy as np
+        lines = np.asarray(lines, dtype=np.int64).reshape(-1, 4)
+        self._x1, self._y1, self._x2, self._y2 = lines.T
+
+        self._dx = np.abs(self._x2 - self._x1)
+        self._dy = np.abs(self._y2 - self._y1)
+
+        self._x_inc_sign = np.where(self._x2 > self._x1, 1, -1)
+        self._y_inc_sign = np.where(self._y2 > self._y1, 1, -1)
+
+    def getPixels(self) -> tuple:
+        '''This function finds the pixel locations of all the lines.
+           A line whose end points coincide gives a single sample.
+
+           ⦿ Output:
+                1. a tuple of arrays x, y, x-plot, y-plot and offsets.
+                   x and y are floats precise till 2 digits, x-plot
+                   and y-plot are their values rounded to nearest
+                   integers. Samples of the i-th line lie between
+                   offsets[i] and offsets[i + 1].
+        '''
+        import numpy as np
+        step = np.maximum(self._dx, self._dy)
+        count = step + 1
+        offsets = np.zeros(len(step) + 1, dtype=np.int64)
+        np.cumsum(count, out=offsets[1:])
+
+        step = np.maximum(step, 1)
+        x_inc = self._dx / step * self._x_inc_sign
+        y_inc = self._dy / step * self._y_inc_sign
+        x = np.empty(offsets[-1])
+        y = np.empty(offsets[-1])
+
+        # Lines of similar length are laid out as rows of one matrix
+        # and accumulated along the rows, which adds the increments in
+        # the same sequence as DDA.getPixels() without a loop per line.
+        bucket = np.frexp(count)[1]
+        for b in np.unique(bucket):
+            lines = np.flatnonzero(bucket == b)
+            width = count[lines].max()
+            valid = np.arange(width) < count[lines, None]
+            index = (offsets[lines, None] + np.arange(width))[valid]
+            for start, inc, out in ((self._x1, x_inc, x),
+                                    (self._y1, y_inc, y)):
+                rows = np.empty((len(lines), width))
+                rows[:, 0] = start[lines]
+                rows[:, 1:] = inc[lines, None]
+                np.cumsum(rows, axis=1, out=rows)
+                out[index] = rows[valid]
+
+        return (np.round(x, 2), np.round(y, 2),
+                np.rint(x).astype(np.int64), np.rint(y).astype(np.int64),
+                offsets)
 
 
 if __name__ == '__main__':
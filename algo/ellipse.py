@@ -1,23 +1,168 @@
+from math import isqrt
+
+
 class Ellipse(object):
-    def __init__(self, x:int, y:int, a:int, b:int) -> None:
+    # Signs of the offsets (x, y) of the first quadrant for each of the
+    # four symmetric pixels, in the order they are given.
+    MIRRORS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+
+    def __init__(self, x:int, y:int, a:int, b:int, clip:tuple = None) -> None:
         super().__init__()
         self._x = x
         self._y = y
         self._a = a
         self._b = b
+        self._clip = clip
         self._pixel_set = []
 
-    def getPixels(self) -> list[int, int, int]:
+    def _regionY(self, x:int) -> int:
+        '''This function finds y of the pixel which the midpoint
+           algorithm picks in column x of region 1. The midpoint
+           (x, y - 1/2) lies inside the ellipse and (x, y + 1/2) does
+           not, so 2y - 1 is the largest odd number m having
+           a²m² < 4b²(a² - x²).
+        '''
+        n = 4 * self._b*self._b * (self._a*self._a - x*x)
+        if n <= 0:
+            return 0
+        return (isqrt(-(-n // (self._a*self._a)) - 1) + 1) // 2
+
+    def _regionEnd(self) -> tuple[int, int]:
+        '''This function finds x and y of the first step of region 2.
+           Region 1 moves x by one for each step, so the point where it
+           ends is searched for among the columns and then walked to
+           with the exact integer decider.
+        '''
+        a2 = self._a*self._a
+        b2 = self._b*self._b
+        if a2 == 0 or b2 == 0:
+            return 0, self._b
+
+        lo = 0
+        hi = self._a
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if b2*mid >= a2*self._regionY(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+
+        x = lo - 1
+        y = self._regionY(x)
+        while b2*x < a2*y:
+            if 4*b2*(x + 1)*(x + 1) + a2*(2*y - 1)*(2*y - 1) >= 4*a2*b2:
+                y = y - 1
+            x = x + 1
+        return x, y
+
+    def _regionStep(self, y:int, end:tuple) -> tuple[int, int]:
+        '''This function finds x and 4 times the decider p of the step
+           of region 2 in row y, region 2 starting at end as given by
+           _regionEnd(). Region 2 carries on the decider of region 1,
+           so 4p = K(y) + 4b²x(x + 1) after every step, K only
+           depending on the row. x moves by one from row y + 1 while
+           p <= 0 there, so it is the first column where the decider of
+           row y + 1 is positive, 2x + 1 being the smallest odd number
+           m having b²m² > b² - K(y + 1), unless region 2 starts right
+           of it.
+        '''
+        x_end, y_end = end
+        a2 = self._a*self._a
+        b2 = self._b*self._b
+        k = lambda y: (4*b2*(x_end + 1) + a2*(2*y_end - 1)**2 - 4*a2*b2
+                       + 4*a2*(y_end - y)*(2 - y_end - y))
+        x = x_end
+        if y < y_end and b2 > 0:
+            n = (b2 - k(y + 1)) // b2
+            if n > 0:
+                x = max(x, (isqrt(n) + 1) // 2)
+        return x, k(y) + 4*b2*x*(x + 1)
+
+    def __len__(self) -> int:
+        '''Region 1 moves x by one for each step and region 2 moves y
+           by one for each step down to 0, both producing four pixels
+           per step. So the count only depends on the point where
+           region 1 ends. Clipped, the visible pixels are counted.
+        '''
+        if self._clip is not None:
+            return sum(1 for pixel in self)
+        x, y = self._regionEnd()
+        return 4 * (x + y + 1)
+
+    def _iterClipped(self):
+        '''This function yields the pixels lying in the viewport.
+           Along the quadrant x grows and y shrinks, so the steps where
+           a mirror is visible are ranges. In region 1, x is the step
+           and y and p = b²(x + 1)² + a²(y - 1/2)² - a²b² are found
+           directly, and in region 2, y is the step and x and p are
+           found by _regionStep(), so the invisible steps of both are
+           skipped.
+        '''
+        from algo.clip import intersect, monotoneSteps, segments
+        xmin, ymin, xmax, ymax = self._clip
+        cx = self._x
+        cy = self._y
+        a2 = self._a*self._a
+        b2 = self._b*self._b
+        x_end, y_end = self._regionEnd()
+
+        ranges = []
+        for sx, sy in self.MIRRORS:
+            fx = lambda k, sx=sx: cx + sx*k
+            fy = lambda k, sy=sy: cy + sy*self._regionY(k)
+            ranges.append(intersect(monotoneSteps(fx, x_end, xmin, xmax),
+                                    monotoneSteps(fy, x_end, ymin, ymax)))
+        for steps, mirrors in segments(ranges):
+            mirrors = [self.MIRRORS[m] for m in mirrors]
+            y = self._regionY(steps.start)
+            p = (4*b2*(steps.start + 1)**2 + a2*(2*y - 1)**2 - 4*a2*b2) / 4
+            for x in steps:
+                for sx, sy in mirrors:
+                    yield (sx*x + cx, sy*y + cy, p)
+                if p < 0:
+                    p = p + 2*b2*(x + 1) + b2
+                else:
+                    y = y - 1
+                    p = p + 2*b2*(x + 1) - 2*a2*y + b2
+
+        # Steps of region 2 are counted by j, having y = y_end - j.
+        end = (x_end, y_end)
+        ranges = []
+        for sx, sy in self.MIRRORS:
+            fx = lambda j, sx=sx: cx + sx*self._regionStep(y_end - j, end)[0]
+            fy = lambda j, sy=sy: cy + sy*(y_end - j)
+            ranges.append(intersect(monotoneSteps(fx, y_end + 1, xmin, xmax),
+                                    monotoneSteps(fy, y_end + 1, ymin, ymax)))
+        for steps, mirrors in segments(ranges):
+            mirrors = [self.MIRRORS[m] for m in mirrors]
+            y = y_end - steps.start
+            x, p = self._regionStep(y, end)
+            p = p / 4
+            for j in steps:
+                for sx, sy in mirrors:
+                    yield (sx*x + cx, sy*y + cy, p)
+                y = y - 1
+                if p > 0:
+                    p = p + a2 - 2*a2*y
+                else:
+                    x = x + 1
+                    p = p + 2*b2*x - 2*a2*y + a2
+
+    def __iter__(self):
+        if self._clip is not None:
+            yield from self._iterClipped()
+            return
+
         x = 0
         y = self._b
         p = self._b*self._b - self._a*self._a*self._b + 0.25*self._a*self._a
         dx = 2 * self._b * self._b * x
         dy = 2 * self._a * self._a * y
         while dx < dy:
-            self._pixel_set.append((x + self._x, y + self._y, p))
-            self._pixel_set.append((-x + self._x, y + self._y, p))
-            self._pixel_set.append((x + self._x, -y + self._y, p))
-            self._pixel_set.append((-x + self._x, -y + self._y, p))
+            yield (x + self._x, y + self._y, p)
+            yield (-x + self._x, y + self._y, p)
+            yield (x + self._x, -y + self._y, p)
+            yield (-x + self._x, -y + self._y, p)
             if p < 0:
                 x = x + 1
                 dx = dx + 2*self._b*self._b
@@ -29,10 +174,10 @@ class Ellipse(object):
                 dy = dy - 2*self._a*self._a
                 p = p + dx - dy + self._b*self._b
         while y >= 0:
-            self._pixel_set.append((x + self._x, y + self._y, p))
-            self._pixel_set.append((-x + self._x, y + self._y, p))
-            self._pixel_set.append((x + self._x, -y + self._y, p))
-            self._pixel_set.append((-x + self._x, -y + self._y, p))
+            yield (x + self._x, y + self._y, p)
+            yield (-x + self._x, y + self._y, p)
+            yield (x + self._x, -y + self._y, p)
+            yield (-x + self._x, -y + self._y, p)
             if p > 0:
                 y = y - 1
                 dy = dy - 2*self._a*self._a
@@ -43,8 +188,184 @@ class Ellipse(object):
                 dx = dx + 2*self._b*self._b
                 dy = dy - 2*self._a*self._a
                 p = p + dx - dy + self._a*self._a
+
+    def getPixels(self) -> list[int, int, int]:
+        self._pixel_set = list(self)
         return self._pixel_set
 
+    def getTrace(self):
+        from algo.trace import PixelTrace
+        return PixelTrace('iid', self)
+
+
+class EllipseBatch(object):
+    '''Mid-point ellipse drawing algorithm for many ellipses at once
+       using NumPy. Every step of every ellipse is found directly from
+       its column in region 1 and its row in region 2, as Ellipse does
+       when clipped, so there are no Python iterations over the steps.
+       The decider is kept multiplied by 4, which makes the 0.25*a*a
+       term of Ellipse an integer, and is exact where the float one of
+       Ellipse would start rounding.
+
+       ⦿ Input:
+            1. ellipses = array of shape (N, 4) having x and y of the
+                          centre, a and b of each ellipse as a row
+    '''
+    SIGN_X = tuple(sx for sx, sy in Ellipse.MIRRORS)
+    SIGN_Y = tuple(sy for sx, sy in Ellipse.MIRRORS)
+
+    def __init__(self, ellipses) -> None:
+        super().__init__()
+        import numpy as np
+        ellipses = np.asarray(ellipses, dtype=np.int64).reshape(-1, 4)
+        self._x, self._y, self._a, self._b = ellipses.T
+
+    @staticmethod
+    def _isqrt(n):
+        '''This function finds isqrt() of every number of n, which
+           floats find within one for numbers below 2**52.
+        '''
+        import numpy as np
+        s = np.sqrt(np.maximum(n, 0)).astype(np.int64)
+        s -= s*s > n
+        s += (s + 1)*(s + 1) <= n
+        return s
+
+    def _regionY(self, x, ellipse=slice(None)):
+        '''This function finds Ellipse._regionY() in column x of every
+           ellipse at once, or of the ellipses indexed by ellipse.
+           floor(4b²x²/a²) is found from the quotient u and the
+           remainder r of 2bx by a as u² + floor(r(2ua + r) / a²), so
+           no term grows past those of the steps, and the square root
+           is taken of a number below 4b².
+        '''
+        import numpy as np
+        a = np.maximum(self._a[ellipse], 1)
+        b = self._b[ellipse]
+        u, r = np.divmod(2*b*x, a)
+        m = 4*b*b - u*u - r*(2*u*a + r) // (a*a) - 1
+        return np.where(m < 0, 0, (self._isqrt(m) + 1) // 2)
+
+    def _regionStep(self, y, end:tuple, ellipse):
+        '''This function finds Ellipse._regionStep() in row y of the
+           ellipses indexed by ellipse, end being the arrays given by
+           _regionEnd(). The terms of K grow past 64 bits for large
+           ellipses, but integers of NumPy wrap around, so 4p, which
+           does not, comes out exact. The quotient n is estimated with
+           floats and then corrected with its remainder, which does not
+           either.
+        '''
+        import numpy as np
+        x_end = end[0][ellipse]
+        y_end = end[1][ellipse]
+        a2 = self._a[ellipse] * self._a[ellipse]
+        b2 = self._b[ellipse] * self._b[ellipse]
+        # K(y) = 4b²(x_end + 1) + a²q(y), q being small enough for floats.
+        q = lambda y: ((2*y_end - 1)*(2*y_end - 1) - 4*b2
+                       + 4*(y_end - y)*(2 - y_end - y))
+        k = lambda y: 4*b2*(x_end + 1) + a2*q(y)
+
+        d = np.maximum(b2, 1)
+        n = np.floor((b2 - 4.0*b2*(x_end + 1) - a2*q(y + 1).astype(float))
+                     / d).astype(np.int64)
+        r = b2 - k(y + 1) - d*n
+        n += (r >= d).astype(np.int64) - (r < 0)
+        stepped = (y < y_end) & (b2 > 0) & (n > 0)
+        x = np.where(stepped, np.maximum(x_end, (self._isqrt(n) + 1) // 2),
+                     x_end)
+        return x, k(y) + 4*b2*x*(x + 1)
+
+    def _regionEnd(self) -> tuple:
+        '''This function finds Ellipse._regionEnd() of every ellipse at
+           once, searching the columns of all of them together and then
+           walking each one to the exact point, where the decider steps
+           y down exactly when y is above _regionY() of the next column.
+
+           ⦿ Output:
+                1. a tuple of arrays x and y of the first step of
+                   region 2.
+        '''
+        import numpy as np
+        a2 = self._a*self._a
+        b2 = self._b*self._b
+        lo = np.zeros_like(self._a)
+        hi = self._a.copy()
+        searching = lo < hi
+        while searching.any():
+            mid = (lo + hi) // 2
+            found = b2*mid >= a2*self._regionY(mid)
+            hi = np.where(searching & found, mid, hi)
+            lo = np.where(searching & ~found, mid + 1, lo)
+            searching = lo < hi
+
+        x = np.maximum(lo - 1, 0)
+        y = self._regionY(x)
+        walking = b2*x < a2*y
+        while walking.any():
+            y = y - (walking & (y > self._regionY(x + 1)))
+            x = x + walking
+            walking = b2*x < a2*y
+        flat = (a2 == 0) | (b2 == 0)
+        return np.where(flat, 0, x), np.where(flat, self._b, y)
+
+    def getQuadrant(self) -> tuple:
+        '''This function finds the steps of all the ellipses in the
+           first quadrant, relative to their centres.
+
+           ⦿ Output:
+                1. a tuple of arrays x, y, p and offsets. p is 4 times
+                   the decider of Ellipse. Steps of the i-th ellipse
+                   lie between offsets[i] and offsets[i + 1].
+        '''
+        import numpy as np
+        # Region 1 takes x_end steps and region 2 takes y_end + 1.
+        end = self._regionEnd()
+        x_end, y_end = end
+        count = x_end + y_end + 1
+        offsets = np.zeros(len(count) + 1, dtype=np.int64)
+        np.cumsum(count, out=offsets[1:])
+
+        ellipse = np.repeat(np.arange(len(count)), count)
+        step = np.arange(offsets[-1]) - offsets[ellipse]
+        region1 = step < x_end[ellipse]
+
+        # In region 1, x is the step and y is _regionY() of its column.
+        # 4p = 4b²(x + 1)² + a²(2y - 1)² - 4a²b² wraps around like K.
+        one = ellipse[region1]
+        x1 = step[region1]
+        y1 = self._regionY(x1, one)
+        a2 = self._a[one] * self._a[one]
+        b2 = self._b[one] * self._b[one]
+        p1 = 4*b2*(x1 + 1)*(x1 + 1) + a2*(2*y1 - 1)*(2*y1 - 1) - 4*a2*b2
+
+        # In region 2, y counts down from y_end to 0.
+        two = ellipse[~region1]
+        y2 = y_end[two] - (step[~region1] - x_end[two])
+        x2, p2 = self._regionStep(y2, end, two)
+
+        qx = np.empty(offsets[-1], dtype=np.int64)
+        qy = np.empty(offsets[-1], dtype=np.int64)
+        qp = np.empty(offsets[-1], dtype=np.int64)
+        qx[region1], qy[region1], qp[region1] = x1, y1, p1
+        qx[~region1], qy[~region1], qp[~region1] = x2, y2, p2
+        return qx, qy, qp, offsets
+
+    def getPixels(self) -> tuple:
+        '''This function mirrors the first quadrant of every ellipse to
+           all four quadrants and moves it to its centre.
+
+           ⦿ Output:
+                1. a tuple of arrays x, y, p and offsets, having the
+                   pixels of each ellipse in the same order as
+                   Ellipse gives them.
+        '''
+        import numpy as np
+        qx, qy, qp, offsets = self.getQuadrant()
+        ellipse = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        x = self._x[ellipse, None] + qx[:, None] * np.array(self.SIGN_X)
+        y = self._y[ellipse, None] + qy[:, None] * np.array(self.SIGN_Y)
+        return x.ravel(), y.ravel(), np.repeat(qp, 4), 4 * offsets
+
 
 if __name__ == '__main__':
     o = Ellipse(0, 0, 2, 3)
@@ -0,0 +1,188 @@
+'''Headless framebuffer of one byte per cell, which shapes are drawn
+   into and which is saved as PGM, PPM or PNG images.
+
+   A cell holds an index into a palette of up to 256 colours, 0 being
+   the background. The framebuffer is a bytearray itself, so it can be
+   read through memoryview(), numpy.frombuffer() or anything else
+   taking the buffer protocol without being copied. Images are written
+   from memoryviews over its rows, a chunk of rows at a time, so no
+   Python object is made per cell.
+'''
+import struct
+import zlib
+
+from algo.tiles import stamp
+
+# Cells written at a time while saving.
+CHUNK = 1 << 20
+
+
+def palette(*colors) -> list:
+    '''This function makes a palette of 256 colours out of the colours
+       of the first indices, the last of them being repeated for the
+       rest.
+
+       ⦿ Input:
+            1. colors = '#rrggbb' strings or (r, g, b) tuples
+
+       ⦿ Output:
+            1. a list of 256 (r, g, b) tuples.
+    '''
+    rgb = [tuple(bytes.fromhex(c.lstrip('#'))) if isinstance(c, str)
+           else tuple(c) for c in colors[:256]]
+    return rgb + rgb[-1:] * (256 - len(rgb))
+
+
+# Black background and white shapes.
+GRAY = bytes([0] + [255] * 255)
+RGB = palette((0, 0, 0), (255, 255, 255))
+
+
+class Framebuffer(bytearray):
+    '''Grid of width x height cells, row by row, one byte per cell.
+
+       ⦿ Input:
+            1. width  = cells along x
+            2. height = cells along y
+    '''
+    def __init__(self, width:int, height:int) -> None:
+        super().__init__(width * height)
+        self.width = width
+        self.height = height
+        self.viewport = (0, 0, width - 1, height - 1)
+
+    def index(self, x:int, y:int) -> int:
+        return y * self.width + x
+
+    def draw(self, algorithm:str, *args, value:int = 1) -> None:
+        '''This function sets the cells under the pixels of a shape to
+           value, computing only the pixels inside the framebuffer.
+
+           ⦿ Input:
+                1. algorithm = 'DDA', 'FixedDDA', 'BLA', 'circle' or
+                               'ellipse'
+                2. args      = arguments of the class of the algorithm
+                3. value     = palette index to set
+        '''
+        stamp(self, self.width, ((algorithm, *args),), self.viewport, value)
+
+    def drawShapes(self, shapes, value:int = 1) -> None:
+        stamp(self, self.width, shapes, self.viewport, value)
+
+    def fillSpans(self, spans, value:int = 1) -> None:
+        '''This function sets the cells of spans (x, y, length), like
+           the ones of algo.fill, to value, a run at a time.
+        '''
+        cells = memoryview(self)
+        for x, y, length in spans:
+            start = y * self.width + x
+            cells[start:start + length] = bytes((value,)) * length
+
+    def rows(self) -> memoryview:
+        '''⦿ Output:
+                1. a memoryview of height x width bytes over the cells.
+        '''
+        return memoryview(self).cast('B', (self.height, self.width))
+
+    def array(self):
+        '''⦿ Output:
+                1. a NumPy array of height x width bytes sharing the
+                   cells of the framebuffer.
+        '''
+        import numpy as np
+        return np.frombuffer(self, np.uint8).reshape(self.height, self.width)
+
+    def _chunks(self):
+        '''This function splits the cells into memoryviews of whole rows
+           of about CHUNK cells each.
+        '''
+        cells = memoryview(self)
+        step = max(CHUNK // max(self.width, 1), 1) * self.width
+        for start in range(0, len(cells), step):
+            yield cells[start:start + step]
+
+    def writePGM(self, path:str, levels:bytes = GRAY) -> None:
+        '''This function saves the framebuffer as a binary PGM image.
+
+           ⦿ Input:
+                1. path   = file to write
+                2. levels = grey level of each palette index, as 256
+                            bytes, or None to write the cells as they
+                            are, without copying them
+        '''
+        with open(path, 'wb') as f:
+            f.write(b'P5\n%d %d\n255\n' % (self.width, self.height))
+            if levels is None:
+                f.write(memoryview(self))
+                return
+            for chunk in self._chunks():
+                f.write(chunk.tobytes().translate(levels))
+
+    def writePPM(self, path:str, colors:list = RGB) -> None:
+        '''This function saves the framebuffer as a binary PPM image.
+           Each chunk is mapped to red, green and blue by bytes
+           translation tables and interleaved by slice assignment.
+
+           ⦿ Input:
+                1. path   = file to write
+                2. colors = palette() of the colours of the indices
+        '''
+        tables = [bytes(c[k] for c in colors) for k in range(3)]
+        with open(path, 'wb') as f:
+            f.write(b'P6\n%d %d\n255\n' % (self.width, self.height))
+            for chunk in self._chunks():
+                cells = chunk.tobytes()
+                pixels = bytearray(3 * len(cells))
+                for k in range(3):
+                    pixels[k::3] = cells.translate(tables[k])
+                f.write(pixels)
+
+    def writePNG(self, path:str, colors:list = RGB, level:int = 6) -> None:
+        '''This function saves the framebuffer as an indexed colour PNG
+           image, whose pixels are the cells themselves. Each row is
+           given to zlib straight from the framebuffer after its filter
+           byte.
+
+           ⦿ Input:
+                1. path   = file to write
+                2. colors = palette() of the colours of the indices
+                3. level  = zlib compression level
+        '''
+        def chunk(kind:bytes, data:bytes) -> None:
+            f.write(struct.pack('>I', len(data)) + kind)
+            f.write(data)
+            f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height,
+                                       8, 3, 0, 0, 0))
+            chunk(b'PLTE', bytes(v for c in colors for v in c))
+
+            cells = memoryview(self)
+            compressor = zlib.compressobj(level)
+            data = bytearray()
+            for start in range(0, len(cells), self.width):
+                data += compressor.compress(b'\x00')
+                data += compressor.compress(cells[start:start + self.width])
+                if len(data) >= CHUNK:
+                    chunk(b'IDAT', data)
+                    data = bytearray()
+            data += compressor.flush()
+            chunk(b'IDAT', data)
+            chunk(b'IEND', b'')
+
+    def save(self, path:str, colors:list = RGB) -> None:
+        '''This function saves the framebuffer as the image type of the
+           extension of path, .pgm, .ppm or .png, or as the raw cells.
+        '''
+        extension = path.rsplit('.', 1)[-1].lower()
+        if extension == 'png':
+            self.writePNG(path, colors)
+        elif extension == 'ppm':
+            self.writePPM(path, colors)
+        elif extension == 'pgm':
+            self.writePGM(path)
+        else:
+            with open(path, 'wb') as f:
+                f.write(memoryview(self))
\ No newline at end of file
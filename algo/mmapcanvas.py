@@ -0,0 +1,243 @@
+'''Canvas of one byte per cell kept in a file instead of memory, for
+   grids far larger than it, like 200k x 200k cells.
+
+   The file holds a header, a directory of the tiles of the canvas and
+   the tiles themselves. A tile is given a slot at the end of the file
+   the first time a cell of it is set, so the file grows with what is
+   drawn rather than with the size of the canvas, and cells of tiles
+   never drawn read as 0. Tiles are reached through memory maps of
+   their slots, of which only the latest used few are kept, so the
+   memory taken stays bounded however large the canvas is.
+'''
+import mmap
+import struct
+from collections import OrderedDict
+
+from algo.framebuffer import Framebuffer
+from algo.tiles import ALGORITHMS
+
+
+# Magic, width, height, side of the tiles and slots taken.
+HEADER = struct.Struct('<8sIIII')
+# Entry of a tile in the directory.
+ENTRY = struct.Struct('<I')
+MAGIC = b'GRAPHIXO'
+
+# Pixels draw() gathers before writing them to their tiles.
+PENDING = 1 << 16
+
+
+def _roundUp(n:int, step:int) -> int:
+    return -(-n // step) * step
+
+
+class MappedCanvas(object):
+    '''Canvas of width x height cells in tiles of tile x tile cells,
+       memory mapped from a file. The directory holds, for every tile
+       row by row, its slot + 1 in little-endian byte order like the
+       header, or 0 if it has none.
+
+       ⦿ Input:
+            1. path   = file of the canvas
+            2. width  = cells along x of a new canvas, replacing the
+                        file. None opens the canvas of the file.
+            3. height = cells along y of a new canvas
+            4. tile   = side of the tiles of a new canvas. Slots are
+                        rounded up to the granularity of memory maps.
+            5. hot    = tiles kept mapped at most, at least 1
+    '''
+    def __init__(self, path:str, width:int = None, height:int = None,
+                 tile:int = 256, hot:int = 64) -> None:
+        super().__init__()
+        if hot < 1:
+            raise ValueError(f'hot must be at least 1, not {hot}')
+        self.path = path
+        self.hot = hot
+        if width is not None:
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, width, height, tile, 0))
+        try:
+            self._file = open(path, 'r+b')
+        except FileNotFoundError:
+            raise FileNotFoundError(f'no canvas file {path}, give a width '
+                                    f'and a height to make one') from None
+        magic, self.width, self.height, self.tile, self.allocated = \
+            HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            self._file.close()
+            raise ValueError(f'{path} is not a canvas file')
+
+        self.columns = -(-self.width // self.tile)
+        self.rows = -(-self.height // self.tile)
+        granularity = mmap.ALLOCATIONGRANULARITY
+        self._slot_size = _roundUp(self.tile * self.tile, granularity)
+        self._data = _roundUp(HEADER.size
+                              + ENTRY.size * self.columns * self.rows,
+                              granularity)
+        if width is not None:
+            self._file.truncate(self._data)
+
+        self._header = mmap.mmap(self._file.fileno(), self._data)
+        self._tiles = OrderedDict()
+        self.viewport = (0, 0, self.width - 1, self.height - 1)
+
+    def _tile(self, tx:int, ty:int, create:bool = False):
+        '''This function maps the tile in column tx and row ty of tiles,
+           giving it a slot first if it has none and create is set.
+
+           ⦿ Output:
+                1. the mmap of the tile, or None if it has no slot.
+        '''
+        key = ty * self.columns + tx
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        entry = HEADER.size + ENTRY.size * key
+        slot = ENTRY.unpack_from(self._header, entry)[0] - 1
+        if slot < 0:
+            if not create:
+                return None
+            slot = self.allocated
+            self.allocated += 1
+            self._file.truncate(self._data + self.allocated * self._slot_size)
+            ENTRY.pack_into(self._header, entry, slot + 1)
+            HEADER.pack_into(self._header, 0, MAGIC, self.width, self.height,
+                             self.tile, self.allocated)
+
+        tile = mmap.mmap(self._file.fileno(), self._slot_size,
+                         offset=self._data + slot * self._slot_size)
+        self._tiles[key] = tile
+        if len(self._tiles) > self.hot:
+            self._tiles.popitem(last=False)[1].close()
+        return tile
+
+    def _tileBoxes(self, box:tuple):
+        '''This function lists the tiles overlapping a box, given like a
+           viewport, along with the part of the canvas each one covers.
+        '''
+        tile = self.tile
+        xmin = max(box[0], 0)
+        ymin = max(box[1], 0)
+        xmax = min(box[2], self.width - 1)
+        ymax = min(box[3], self.height - 1)
+        if xmin > xmax or ymin > ymax:
+            return
+        for ty in range(ymin // tile, ymax // tile + 1):
+            for tx in range(xmin // tile, xmax // tile + 1):
+                yield tx, ty, (tx * tile, ty * tile,
+                               min(tx * tile + tile, self.width) - 1,
+                               min(ty * tile + tile, self.height) - 1)
+
+    def get(self, x:int, y:int) -> int:
+        tile = self._tile(x // self.tile, y // self.tile)
+        if tile is None:
+            return 0
+        return tile[(y % self.tile) * self.tile + x % self.tile]
+
+    def set(self, x:int, y:int, value:int) -> None:
+        tile = self._tile(x // self.tile, y // self.tile, True)
+        tile[(y % self.tile) * self.tile + x % self.tile] = value
+
+    def draw(self, algorithm:str, *args, value:int = 1) -> None:
+        '''This function sets the cells under the pixels of a shape to
+           value, straight in the maps of the tiles. The pixels are
+           computed once, clipped to the canvas, and gathered by tile up
+           to PENDING at a time, so each tile is mapped once per batch
+           rather than once per pixel, and only tiles some pixel lies in
+           are given a slot.
+
+           ⦿ Input:
+                1. algorithm = 'DDA', 'FixedDDA', 'BLA', 'circle' or
+                               'ellipse'
+                2. args      = arguments of the class of the algorithm
+                3. value     = palette index to set
+        '''
+        algoclass, k = ALGORITHMS[algorithm]
+        side = self.tile
+        columns = self.columns
+        pending = {}
+        gathered = 0
+        for step in algoclass(*args, clip=self.viewport):
+            x, y = step[k], step[k + 1]
+            key = (y // side) * columns + x // side
+            cells = pending.get(key)
+            if cells is None:
+                cells = pending[key] = []
+            cells.append((y % side) * side + x % side)
+            gathered += 1
+            if gathered == PENDING:
+                self._write(pending, value)
+                gathered = 0
+        self._write(pending, value)
+
+    def _write(self, pending:dict, value:int) -> None:
+        '''This function sets the cells gathered by draw() for each
+           tile, given by the key of the tile, and empties pending.
+        '''
+        for key, cells in pending.items():
+            tile = self._tile(key % self.columns, key // self.columns, True)
+            for cell in cells:
+                tile[cell] = value
+        pending.clear()
+
+    def drawShapes(self, shapes, value:int = 1) -> None:
+        for algorithm, *args in shapes:
+            self.draw(algorithm, *args, value=value)
+
+    def window(self, box:tuple) -> Framebuffer:
+        '''This function copies the cells of a box, like the part of the
+           canvas on screen, mapping only the tiles it overlaps which
+           have a slot.
+
+           ⦿ Output:
+                1. a Framebuffer of the cells of the box, 0 outside the
+                   canvas.
+        '''
+        xmin, ymin, xmax, ymax = box
+        window = Framebuffer(xmax - xmin + 1, ymax - ymin + 1)
+        target = memoryview(window)
+        side = self.tile
+        for tx, ty, (x1, y1, x2, y2) in self._tileBoxes(box):
+            tile = self._tile(tx, ty)
+            if tile is None:
+                continue
+            x1 = max(x1, xmin)
+            x2 = min(x2, xmax)
+            with memoryview(tile) as source:
+                for y in range(max(y1, ymin), min(y2, ymax) + 1):
+                    start = (y % side) * side + x1 % side
+                    at = (y - ymin) * window.width + x1 - xmin
+                    target[at:at + x2 - x1 + 1] = \
+                        source[start:start + x2 - x1 + 1]
+        target.release()
+        return window
+
+    def flush(self) -> None:
+        for tile in self._tiles.values():
+            tile.flush()
+        self._header.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        for tile in self._tiles.values():
+            tile.close()
+        self._tiles.clear()
+        self._header.close()
+        self._file.close()
+
+    @property
+    def nbytes(self) -> int:
+        '''⦿ Output:
+                1. bytes the tiles take in the file.
+        '''
+        return self.allocated * self._slot_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
\ No newline at end of file
@@ -0,0 +1,257 @@
+'''Scenes of many shapes drawn on one grid, found by where they lie.
+'''
+from itertools import count, product
+
+from algo.cache import ShapeCache
+from algo.clip import boxOverlap, inside
+
+
+class GridIndex(object):
+    '''Spatial index of bounding boxes over a uniform grid of square
+       cells. Each box is listed in every cell it overlaps, so finding
+       the boxes around a point looks at a single cell however many
+       boxes there are. Boxes overlapping more than max_cells cells are
+       kept apart in a list checked on every query instead.
+
+       ⦿ Input:
+            1. cell      = side of the cells
+            2. max_cells = most cells a box is listed in
+    '''
+    def __init__(self, cell:int = 32, max_cells:int = 256) -> None:
+        super().__init__()
+        self._cell = cell
+        self._max_cells = max_cells
+        self._cells = {}
+        self._boxes = {}
+        self._large = set()
+
+    def _cellRange(self, box:tuple) -> tuple[range, range]:
+        cell = self._cell
+        return (range(box[0] // cell, box[2] // cell + 1),
+                range(box[1] // cell, box[3] // cell + 1))
+
+    def insert(self, key, box:tuple) -> None:
+        self._boxes[key] = box
+        columns, rows = self._cellRange(box)
+        if len(columns) * len(rows) > self._max_cells:
+            self._large.add(key)
+            return
+        for cx in columns:
+            for cy in rows:
+                self._cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key) -> None:
+        box = self._boxes.pop(key)
+        if key in self._large:
+            self._large.discard(key)
+            return
+        columns, rows = self._cellRange(box)
+        for cx in columns:
+            for cy in rows:
+                keys = self._cells[cx, cy]
+                keys.discard(key)
+                if not keys:
+                    del self._cells[cx, cy]
+
+    def query(self, box:tuple) -> set:
+        '''This function finds the boxes overlapping a box, looking at
+           the cells it covers, or at the occupied cells if they are
+           fewer.
+
+           ⦿ Output:
+                1. a set of the keys of the boxes.
+        '''
+        columns, rows = self._cellRange(box)
+        if len(columns) * len(rows) <= len(self._cells):
+            cells = (self._cells.get((cx, cy)) for cx in columns
+                     for cy in rows)
+        else:
+            cells = (keys for (cx, cy), keys in self._cells.items()
+                     if cx in columns and cy in rows)
+
+        found = {k for k in self._large if boxOverlap(self._boxes[k], box)}
+        for keys in cells:
+            if keys:
+                found.update(k for k in keys
+                             if boxOverlap(self._boxes[k], box))
+        return found
+
+    def box(self, key) -> tuple:
+        return self._boxes[key]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._boxes.clear()
+        self._large.clear()
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+
+class Scene(object):
+    '''Shapes drawn with any of the algorithms, kept together with the
+       pixels they cover. Every shape gets a key when added, and is
+       indexed by its bounding box, so the shapes under a pixel are
+       found without looking at the others, and removing or moving a
+       shape gives the pixels to redraw.
+       Shapes added with a viewport keep only their pixels inside it,
+       wherever they are moved. Clip the pixels of the others when
+       drawing them.
+
+       ⦿ Input:
+            1. cache = ShapeCache to take the pixels of the shapes from.
+                       None computes them every time.
+            2. cell  = side of the cells of the spatial index
+    '''
+    # Position of x-plot in the steps of each algorithm.
+    PLOT = {'DDA' : 2, 'FixedDDA' : 2, 'BLA' : 0, 'circle' : 0,
+            'ellipse' : 0}
+
+    def __init__(self, cache:ShapeCache = None, cell:int = 32) -> None:
+        super().__init__()
+        self._cache = ShapeCache(0) if cache is None else cache
+        self._index = GridIndex(cell)
+        self._shapes = {}
+        self._coverage = {}
+        self._keys = count()
+
+    def _footprint(self, algorithm:str, args:tuple, clip:tuple) -> frozenset:
+        '''This function finds the distinct pixels of a shape, inside
+           the viewport clip if given.
+
+           ⦿ Output:
+                1. a frozenset of x and y of the pixels.
+        '''
+        k = self.PLOT[algorithm]
+        return frozenset((step[k], step[k + 1])
+                         for step in self._cache.get(algorithm, *args,
+                                                     clip=clip))
+
+    def _place(self, key:int, algorithm:str, args:tuple,
+               clip:tuple) -> frozenset:
+        footprint = self._footprint(algorithm, args, clip)
+        self._shapes[key] = (algorithm, args, footprint, clip)
+        if footprint:
+            xs = [x for x, y in footprint]
+            ys = [y for x, y in footprint]
+            self._index.insert(key, (min(xs), min(ys), max(xs), max(ys)))
+
+        coverage = self._coverage
+        for pixel in footprint:
+            coverage[pixel] = coverage.get(pixel, 0) + 1
+        return footprint
+
+    def _lift(self, key:int) -> frozenset:
+        algorithm, args, footprint, clip = self._shapes.pop(key)
+        if footprint:
+            self._index.remove(key)
+
+        coverage = self._coverage
+        for pixel in footprint:
+            if coverage[pixel] == 1:
+                del coverage[pixel]
+            else:
+                coverage[pixel] -= 1
+        return footprint
+
+    def add(self, algorithm:str, *args, clip:tuple = None) -> int:
+        '''This function adds a shape to the scene.
+
+           ⦿ Input:
+                1. algorithm = 'DDA', 'FixedDDA', 'BLA', 'circle' or
+                               'ellipse'
+                2. args      = arguments of the class of the algorithm
+                3. clip      = viewport (xmin, ymin, xmax, ymax) to keep
+                               only the pixels inside of
+
+           ⦿ Output:
+                1. the key of the shape.
+        '''
+        key = next(self._keys)
+        self._place(key, algorithm, args, clip)
+        return key
+
+    def remove(self, key:int) -> frozenset:
+        '''This function removes a shape from the scene.
+
+           ⦿ Output:
+                1. the pixels the shape covered, which are to be redrawn.
+        '''
+        return self._lift(key)
+
+    def move(self, key:int, dx:int, dy:int) -> tuple[frozenset, frozenset]:
+        '''This function moves a shape by dx and dy. Its pixels are
+           computed again at the new position, as a DDA line may round
+           differently there.
+
+           ⦿ Output:
+                1. the pixels the shape covered before and the ones it
+                   covers now.
+        '''
+        algorithm, args, footprint, clip = self._shapes[key]
+        if algorithm in ('DDA', 'FixedDDA', 'BLA'):
+            x1, y1, x2, y2 = args
+            moved = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+        else:
+            x, y, *axes = args
+            moved = (x + dx, y + dy, *axes)
+        before = self._lift(key)
+        return before, self._place(key, algorithm, moved, clip)
+
+    def at(self, x:int, y:int) -> list[int]:
+        '''This function hit-tests the pixel at (x, y).
+
+           ⦿ Output:
+                1. keys of the shapes having a pixel at (x, y), the
+                   latest added first.
+        '''
+        if (x, y) not in self._coverage:
+            return []
+        return sorted((k for k in self._index.query((x, y, x, y))
+                       if (x, y) in self._shapes[k][2]), reverse=True)
+
+    def covers(self, x:int, y:int) -> bool:
+        return (x, y) in self._coverage
+
+    def coverage(self, box:tuple) -> int:
+        '''This function counts the pixels inside a box which the
+           shapes cover, like those of a run of a line.
+        '''
+        xmin, ymin, xmax, ymax = box
+        return len(self._coverage.keys() & product(range(xmin, xmax + 1),
+                                                   range(ymin, ymax + 1)))
+
+    def pixels(self, key:int) -> frozenset:
+        return self._shapes[key][2]
+
+    def pixelsIn(self, box:tuple) -> set:
+        '''This function finds the pixels of all the shapes inside a
+           box, like a viewport.
+
+           ⦿ Output:
+                1. a set of x and y of the pixels.
+        '''
+        found = set()
+        for key in self._index.query(box):
+            found.update(p for p in self._shapes[key][2] if inside(*p, box))
+        return found
+
+    def shape(self, key:int) -> tuple:
+        '''⦿ Output:
+                1. the algorithm of a shape and its arguments.
+        '''
+        return self._shapes[key][:2]
+
+    def clear(self) -> None:
+        self._index.clear()
+        self._shapes.clear()
+        self._coverage.clear()
+
+    def __contains__(self, key:int) -> bool:
+        return key in self._shapes
+
+    def __iter__(self):
+        return iter(self._shapes)
+
+    def __len__(self) -> int:
+        return len(self._shapes)
\ No newline at end of file
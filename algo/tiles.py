@@ -0,0 +1,235 @@
+'''Rasterization of many shapes over a canvas split into tiles, which
+   are drawn in parallel by a pool of processes.
+
+   A canvas is a bytearray of one byte per cell, row by row, holding 1
+   where a pixel of some shape lies and 0 elsewhere. Each tile is drawn
+   by a worker from only the shapes whose bounding box overlaps it,
+   clipped to the tile, and comes back as the bytes of the tile alone,
+   so no pixel crosses between the processes as a Python object.
+'''
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from algo.bla import BLA
+from algo.dda import DDA, FixedDDA
+from algo.circle import Circle
+from algo.ellipse import Ellipse
+
+
+# Class of each algorithm and position of x-plot in its steps.
+ALGORITHMS = {'DDA'      : (DDA, 2),
+              'FixedDDA' : (FixedDDA, 2),
+              'BLA'      : (BLA, 0),
+              'circle'   : (Circle, 0),
+              'ellipse'  : (Ellipse, 0)}
+# Shortest mean run of the BLA lines drawn a run at a time. Shorter
+# runs are slower to assign than their pixels one by one.
+MIN_RUN = 4
+
+
+def shapeBox(algorithm:str, args:tuple) -> tuple:
+    '''This function finds a box, given like a viewport, which all the
+       pixels of a shape lie in.
+    '''
+    if algorithm in ('DDA', 'FixedDDA', 'BLA'):
+        x1, y1, x2, y2 = args
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+    elif algorithm == 'circle':
+        x, y, r = args
+        return x - r, y - r, x + r, y + r
+    elif algorithm == 'ellipse':
+        x, y, a, b = args
+        return x - a, y - b, x + a, y + b
+    raise ValueError(f'unknown algorithm {algorithm!r}')
+
+
+def touches(algorithm:str, args:tuple, box:tuple) -> bool:
+    '''This function tells whether a shape may have pixels in a box
+       overlapping its bounding box. Lines may. The pixels of a circle
+       or an ellipse lie where |b²x² + a²y² - a²b²| <= 4 max(a²(b + 1),
+       b²(a + 1)) around the centre, which is about two pixels off the
+       curve, so the boxes lying wholly inside or outside of that band
+       are left out. The band is closed, so that a shape of no size,
+       whose band is 0, still lands on the tile holding its centre.
+    '''
+    if algorithm in ('DDA', 'FixedDDA', 'BLA'):
+        return True
+    if algorithm == 'circle':
+        x, y, a = args
+        b = a
+    else:
+        x, y, a, b = args
+    band = 4 * max(a*a*(b + 1), b*b*(a + 1))
+    x1, x2 = box[0] - x, box[2] - x
+    y1, y2 = box[1] - y, box[3] - y
+    far = b*b*max(x1*x1, x2*x2) + a*a*max(y1*y1, y2*y2) - a*a*b*b
+    near_x = 0 if x1 <= 0 <= x2 else min(x1*x1, x2*x2)
+    near_y = 0 if y1 <= 0 <= y2 else min(y1*y1, y2*y2)
+    near = b*b*near_x + a*a*near_y - a*a*b*b
+    return far >= -band and near <= band
+
+
+def stamp(buffer, width:int, shapes, box:tuple, value:int = 1) -> None:
+    '''This function sets the cells of buffer under the pixels of the
+       shapes inside box to value, buffer holding the cells of box row
+       by row.
+
+       ⦿ Input:
+            1. buffer = writable buffer of width cells per row
+            2. width  = cells per row of buffer
+            3. shapes = tuples of an algorithm and its arguments, like
+                        ('circle', 0, 0, 5)
+            4. box    = viewport (xmin, ymin, xmax, ymax) buffer covers
+    '''
+    xmin, ymin = box[0], box[1]
+    for algorithm, *args in shapes:
+        algoclass, k = ALGORITHMS[algorithm]
+        if algoclass is BLA and longRuns(*args):
+            stampRuns(buffer, width, BLA(*args, clip=box), box, value)
+            continue
+        for step in algoclass(*args, clip=box):
+            buffer[(step[k + 1] - ymin) * width + step[k] - xmin] = value
+
+
+def longRuns(x1:int, y1:int, x2:int, y2:int) -> bool:
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    return max(dx, dy) >= MIN_RUN * min(dx, dy)
+
+
+def stampRuns(buffer, width:int, line:BLA, box:tuple,
+              value:int = 1) -> None:
+    '''This function sets the cells of buffer under a BLA line a run at
+       a time, rows of cells by slice assignment and columns by extended
+       slice assignment a row apart, like stamp().
+    '''
+    xmin, ymin = box[0], box[1]
+    run = bytes((value,))
+    if line.horizontal:
+        for start, length, y in line.iterRuns():
+            at = (y - ymin) * width + start - xmin
+            buffer[at:at + length] = run * length
+    else:
+        for start, length, x in line.iterRuns():
+            at = (start - ymin) * width + x - xmin
+            buffer[at:at + length * width:width] = run * length
+
+
+def rasterizeTile(shapes:list, box:tuple) -> bytearray:
+    '''This function draws the shapes into a tile of its own, run by
+       the workers.
+
+       ⦿ Output:
+            1. a bytearray of the cells of box, row by row.
+    '''
+    width = box[2] - box[0] + 1
+    buffer = bytearray(width * (box[3] - box[1] + 1))
+    stamp(buffer, width, shapes, box)
+    return buffer
+
+
+class TiledRenderer(object):
+    '''Draws shapes on a canvas of width x height cells, split into
+       tiles of tile x tile cells rasterized in parallel. The pool of
+       workers is started on the first render() and kept until
+       close(), so it can be used as a context manager.
+
+       ⦿ Input:
+            1. width   = cells along x
+            2. height  = cells along y
+            3. tile    = side of the tiles
+            4. workers = processes to draw with, os.cpu_count() if None.
+                         0 draws the tiles one by one in this process.
+    '''
+    def __init__(self, width:int, height:int, tile:int = 512,
+                 workers:int = None) -> None:
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.workers = os.cpu_count() if workers is None else workers
+        self._pool = None
+
+    def tiles(self, shapes) -> dict:
+        '''This function assigns every shape to the tiles its bounding
+           box overlaps and it may have pixels in, keeping the order of
+           the shapes.
+
+           ⦿ Output:
+                1. a dict of the box of a tile : its shapes.
+        '''
+        tile = self.tile
+        jobs = {}
+        for shape in shapes:
+            xmin, ymin, xmax, ymax = shapeBox(shape[0], shape[1:])
+            xmin = max(xmin, 0)
+            ymin = max(ymin, 0)
+            xmax = min(xmax, self.width - 1)
+            ymax = min(ymax, self.height - 1)
+            for ty in range(ymin // tile, ymax // tile + 1):
+                for tx in range(xmin // tile, xmax // tile + 1):
+                    box = (tx * tile, ty * tile,
+                           min(tx * tile + tile, self.width) - 1,
+                           min(ty * tile + tile, self.height) - 1)
+                    if touches(shape[0], shape[1:], box):
+                        jobs.setdefault(box, []).append(shape)
+        return jobs
+
+    def _paste(self, canvas:bytearray, box:tuple, buffer) -> None:
+        width = box[2] - box[0] + 1
+        source = memoryview(buffer)
+        target = memoryview(canvas)
+        for row, y in enumerate(range(box[1], box[3] + 1)):
+            start = y * self.width + box[0]
+            target[start:start + width] = source[row * width:
+                                                 (row + 1) * width]
+
+    def render(self, shapes, canvas = None) -> bytearray:
+        '''This function draws the shapes tile by tile.
+
+           ⦿ Input:
+                1. shapes = tuples of an algorithm and its arguments,
+                            like ('BLA', 0, 0, 9, 4)
+                2. canvas = writable buffer of width x height cells to
+                            draw into, like an algo.framebuffer
+                            Framebuffer. The tiles having shapes replace
+                            its cells.
+
+           ⦿ Output:
+                1. the canvas, a new bytearray if none is given.
+        '''
+        if canvas is None:
+            canvas = bytearray(self.width * self.height)
+        jobs = self.tiles(shapes)
+        if self.workers == 0:
+            for box, tile_shapes in jobs.items():
+                self._paste(canvas, box, rasterizeTile(tile_shapes, box))
+            return canvas
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        futures = {self._pool.submit(rasterizeTile, tile_shapes, box) : box
+                   for box, tile_shapes in jobs.items()}
+        for future in as_completed(futures):
+            self._paste(canvas, futures[future], future.result())
+        return canvas
+
+    def renderSerial(self, shapes) -> bytearray:
+        '''This function draws the shapes one after another over the
+           whole canvas, without tiles, to check render() against.
+        '''
+        canvas = bytearray(self.width * self.height)
+        stamp(canvas, self.width, shapes,
+              (0, 0, self.width - 1, self.height - 1))
+        return canvas
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
\ No newline at end of file
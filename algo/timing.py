@@ -0,0 +1,119 @@
+import json
+import time
+from collections import deque
+
+
+class Timings(object):
+    '''Durations of named sections of code, like computing the pixels of
+       a shape or restyling the grid. Only the latest durations of each
+       section are kept, in a ring buffer, so that timing a long session
+       takes bounded memory. Methods instrumented are put back by
+       uninstrument(), or on leaving the Timings used as a context
+       manager.
+
+       ⦿ Input:
+            1. size = number of latest durations kept per section
+    '''
+    def __init__(self, size:int = 256) -> None:
+        super().__init__()
+        self._size = size
+        self._sections = {}
+        self._patched = []
+
+    def record(self, name:str, seconds:float) -> None:
+        durations = self._sections.get(name)
+        if durations is None:
+            durations = self._sections[name] = deque(maxlen=self._size)
+        durations.append(seconds)
+
+    def instrument(self, owner, *methods:str) -> None:
+        '''This function replaces methods of a class or of an object by
+           ones recording how long every call takes, under the name of
+           the class and the method. A method a subclass inherits from
+           a class instrumented before is timed apart under the name of
+           the subclass. Methods connected to Qt signals must not be
+           instrumented, as the wrapper would be passed the arguments
+           of the signal.
+
+           ⦿ Input:
+                1. owner   = class or object having the methods
+                2. methods = names of the methods
+        '''
+        cls = owner if isinstance(owner, type) else type(owner)
+        for method in methods:
+            func = getattr(owner, method)
+            if getattr(func, '_timings', None) is self:
+                if not isinstance(owner, type) or method in vars(owner):
+                    continue
+                func = func.__wrapped__
+            name = f'{cls.__name__}.{method}'
+
+            def timed(*args, _func=func, _name=name, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _func(*args, **kwargs)
+                finally:
+                    self.record(_name, time.perf_counter() - start)
+
+            timed._timings = self
+            timed.__wrapped__ = func
+            timed.__name__ = method
+            timed.__doc__ = func.__doc__
+            self._patched.append((owner, method, vars(owner).get(method)))
+            setattr(owner, method, timed)
+
+    def uninstrument(self) -> None:
+        '''This function puts back the methods replaced by instrument(),
+           the latest first, so that classes timed for one window are
+           not timed for the rest of the process.
+        '''
+        while self._patched:
+            owner, method, original = self._patched.pop()
+            if original is None:
+                delattr(owner, method)
+            else:
+                setattr(owner, method, original)
+
+    def summary(self) -> dict:
+        '''This function sums up the durations of each section.
+
+           ⦿ Output:
+                1. a dict of section name : dict of the number of
+                   calls kept and their min, mean and 95th percentile
+                   durations in mS.
+        '''
+        summary = {}
+        for name, durations in self._sections.items():
+            ordered = sorted(durations)
+            count = len(ordered)
+            summary[name] = {'count' : count,
+                             'min_ms' : 1000 * ordered[0],
+                             'mean_ms' : 1000 * sum(ordered) / count,
+                             'p95_ms' : 1000 * ordered[min(int(0.95 * count),
+                                                            count - 1)]}
+        return summary
+
+    def format(self, limit:int = None) -> str:
+        '''This function lists min / mean / p95 durations in mS of the
+           sections, the slowest at p95 first.
+        '''
+        summary = sorted(self.summary().items(),
+                         key=lambda item: item[1]['p95_ms'], reverse=True)
+        return '\n'.join(f'{name} : {s["min_ms"]:.2f} / {s["mean_ms"]:.2f} / '
+                         f'{s["p95_ms"]:.2f}' for name, s in summary[:limit])
+
+    def dump(self, path:str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def clear(self) -> None:
+        self._sections.clear()
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.uninstrument()
\ No newline at end of file
@@ -0,0 +1,96 @@
+from array import array
+
+
+class PixelTrace(object):
+    '''Compact record of the steps taken by a line, circle or ellipse
+       drawing algorithm. Instead of one tuple per pixel, every field
+       of the steps is kept in its own typed array, so a pixel costs a
+       few bytes per field.
+
+       ⦿ Input:
+            1. typecodes = array typecode for each field of a step,
+                           like 'iid' for x, y and a float p
+            2. steps     = steps to start the trace with
+    '''
+    def __init__(self, typecodes:str, steps=()) -> None:
+        super().__init__()
+        self._typecodes = typecodes
+        self._columns = tuple(array(t) for t in typecodes)
+        self.extend(steps)
+
+    def append(self, step:tuple) -> None:
+        for column, value in zip(self._columns, step):
+            column.append(value)
+
+    def extend(self, steps) -> None:
+        columns = self._columns
+        for step in steps:
+            for column, value in zip(columns, step):
+                column.append(value)
+
+    def column(self, k:int) -> memoryview:
+        '''This function exposes the k-th field of all the steps
+           without copying them.
+
+           ⦿ Output:
+                1. a memoryview over the array holding the field.
+        '''
+        return memoryview(self._columns[k])
+
+    def shifted(self, dx:int, dy:int):
+        return ShiftedTrace(self, dx, dy)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(c) * c.itemsize for c in self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            trace = PixelTrace(self._typecodes)
+            trace._columns = tuple(c[index] for c in self._columns)
+            return trace
+        return tuple(c[index] for c in self._columns)
+
+    def __iter__(self):
+        return zip(*self._columns)
+
+    def __repr__(self) -> str:
+        return f'PixelTrace({self._typecodes!r}, {len(self)} steps)'
+
+
+class ShiftedTrace(object):
+    '''View of a PixelTrace whose first two fields, x and y, are moved
+       by an offset when read, without copying the trace.
+
+       ⦿ Input:
+            1. trace = PixelTrace with x and y as its first fields
+            2. dx    = offset along x
+            3. dy    = offset along y
+    '''
+    def __init__(self, trace:PixelTrace, dx:int, dy:int) -> None:
+        super().__init__()
+        self._trace = trace
+        self._dx = dx
+        self._dy = dy
+
+    @property
+    def nbytes(self) -> int:
+        return self._trace.nbytes
+
+    def __len__(self) -> int:
+        return len(self._trace)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ShiftedTrace(self._trace[index], self._dx, self._dy)
+        x, y, *rest = self._trace[index]
+        return (x + self._dx, y + self._dy, *rest)
+
+    def __iter__(self):
+        dx = self._dx
+        dy = self._dy
+        for x, y, *rest in self._trace:
+            yield (x + dx, y + dy, *rest)
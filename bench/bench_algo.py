@@ -0,0 +1,198 @@
+'''Micro-benchmarks for the line, circle and ellipse algorithms.
+
+   Every engine is run over a range of sizes (and over all the eight
+   octants for lines) and its speed in pixels per second, the peak
+   memory taken while it runs and the number of memory blocks its
+   result holds are recorded. Results can be saved as JSON and compared
+   against a saved baseline, failing when an engine gets slower or
+   takes more memory than the given tolerances allow.
+
+   ⦿ Usage:
+        python bench/bench_algo.py --output baseline.json
+        python bench/bench_algo.py --baseline baseline.json
+        python bench/bench_algo.py --engines BLA BLABatch --max-size 10000
+'''
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algo.bla import BLA, BLABatch, DoubleStepBLA
+from algo.dda import DDA, DDABatch, FixedDDA
+from algo.circle import Circle, OctantCircle
+from algo.ellipse import Ellipse, EllipseBatch
+
+
+LINE_LENGTHS = (10, 100, 1000, 10**4, 10**5, 10**6)
+RADII = (1, 10, 100, 1000, 10**4, 10**5)
+
+# Direction of a line of length 3 in each of the eight octants.
+OCTANTS = ((3, 1), (1, 3), (-1, 3), (-3, 1), (-3, -1), (-1, -3), (1, -3),
+           (3, -1))
+
+# Engine name : (family, function running it and giving its result,
+#                function counting the pixels of the result)
+ENGINES = {
+    'DDA'          : ('line', lambda *a: DDA(*a).getPixels(), len),
+    'FixedDDA'     : ('line', lambda *a: FixedDDA(*a).getPixels(), len),
+    'BLA'          : ('line', lambda *a: BLA(*a).getPixels(), len),
+    'BLARuns'      : ('line', lambda *a: BLA(*a).getRuns(),
+                      lambda r: sum(run[1] for run in r)),
+    'DoubleStepBLA': ('line', lambda *a: DoubleStepBLA(*a).getPixels(), len),
+    'DDABatch'     : ('line', lambda *a: DDABatch([a]).getPixels(),
+                      lambda r: len(r[0])),
+    'BLABatch'     : ('line', lambda *a: BLABatch([a]).getPixels(), len),
+    'Circle'       : ('circle', lambda r: Circle(0, 0, r).getPixels(), len),
+    'OctantCircle' : ('circle', lambda r: OctantCircle(0, 0, r).getOctant(),
+                      lambda r: 8 * len(r)),
+    'Ellipse'      : ('ellipse', lambda a, b: Ellipse(0, 0, a, b).getPixels(),
+                      len),
+    'EllipseBatch' : ('ellipse',
+                      lambda a, b: EllipseBatch([(0, 0, a, b)]).getPixels(),
+                      lambda r: len(r[0])),
+}
+
+
+def cases(family:str, max_size:int):
+    '''This function lists the arguments each engine of a family is
+       benchmarked with.
+
+       ⦿ Output:
+            1. tuples of a name for the case and the arguments.
+    '''
+    if family == 'line':
+        for length in LINE_LENGTHS:
+            if length > max_size:
+                continue
+            for octant, (dx, dy) in enumerate(OCTANTS):
+                args = (0, 0, dx * length // 3, dy * length // 3)
+                yield f'length={length}/octant={octant}', args
+    elif family == 'circle':
+        for r in RADII:
+            if r <= max_size:
+                yield f'r={r}', (r,)
+    elif family == 'ellipse':
+        for a in RADII:
+            if a <= max_size:
+                yield f'a={a}/b={max(a // 2, 1)}', (a, max(a // 2, 1))
+
+
+def measure(run, count, args:tuple, repeat:int) -> dict:
+    '''This function times an engine on one case, after running it
+       once to warm up, and measures the memory it takes.
+
+       ⦿ Output:
+            1. a dict of the pixels produced, best time in seconds,
+               pixels per second, peak bytes allocated and memory
+               blocks held by the result.
+    '''
+    run(*args)
+    best = float('inf')
+    for i in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = run(*args)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    gc.collect()
+    gc.disable()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = run(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+    gc.enable()
+
+    pixels = count(result)
+    return {'pixels' : pixels,
+            'seconds' : best,
+            'pixels_per_s' : pixels / best if best else float('inf'),
+            'peak_bytes' : peak,
+            'blocks' : blocks}
+
+
+def compare(results:dict, baseline:dict, speed_tol:float,
+            memory_tol:float) -> list:
+    '''This function finds the cases which got slower or took more
+       memory than the baseline allows.
+
+       ⦿ Output:
+            1. a list of messages, one per regression.
+    '''
+    regressions = []
+    for key, now in results.items():
+        then = baseline.get(key)
+        if then is None:
+            continue
+        if now['pixels_per_s'] < then['pixels_per_s'] * (1 - speed_tol):
+            regressions.append(f'{key}: {now["pixels_per_s"]:.0f} pixels/s'
+                               f' against {then["pixels_per_s"]:.0f}')
+        if now['peak_bytes'] > then['peak_bytes'] * (1 + memory_tol):
+            regressions.append(f'{key}: {now["peak_bytes"]} peak bytes'
+                               f' against {then["peak_bytes"]}')
+    return regressions
+
+
+def main(argv:list = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the algorithms '
+                                     'of the algo package.')
+    parser.add_argument('--engines', nargs='+', choices=tuple(ENGINES),
+                        default=tuple(ENGINES))
+    parser.add_argument('--max-size', type=int, default=10**6,
+                        help='largest line length, radius or axis to run')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs to take the best time of')
+    parser.add_argument('--output', help='file to save the results to')
+    parser.add_argument('--baseline', help='results to compare against')
+    parser.add_argument('--speed-tolerance', type=float, default=0.10,
+                        help='allowed drop in pixels/s (default 10%%)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10,
+                        help='allowed rise in peak memory (default 10%%)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f'{"case":<42}{"pixels":>10}{"pixels/s":>14}{"peak KiB":>12}'
+          f'{"blocks":>10}')
+    for engine in args.engines:
+        family, run, count = ENGINES[engine]
+        for name, case_args in cases(family, args.max_size):
+            key = f'{engine}/{name}'
+            try:
+                results[key] = measure(run, count, case_args, args.repeat)
+            except ImportError as error:
+                print(f'{engine:<42}skipped, {error}')
+                break
+            r = results[key]
+            print(f'{key:<42}{r["pixels"]:>10}{r["pixels_per_s"]:>14.0f}'
+                  f'{r["peak_bytes"] / 1024:>12.1f}{r["blocks"]:>10}',
+                  flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python' : platform.python_version(),
+                       'machine' : platform.machine(),
+                       'results' : results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.speed_tolerance,
+                              args.memory_tolerance)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        if regressions:
+            return 1
+        print(f'no regressions against {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
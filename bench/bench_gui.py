@@ -0,0 +1,184 @@
+'''End-to-end benchmark of the GUI under the offscreen Qt platform.
+
+   For each grid mode and algorithm a window is built for a fixed fake
+   screen size and a scripted session is replayed on it: the points of
+   the shape are clicked, the simulation is started and stepped to
+   completion, and the grid is cleared. Then the same shape is played
+   with playSimulation() at an interval of 0 mS until its timer stops.
+   Every step includes processing the events it posts, so repaints are
+   counted too.
+   The window is driven directly, without the blocking execApp().
+
+   ⦿ Usage:
+        python bench/bench_gui.py
+        python bench/bench_gui.py --modes buttons --width 1366 --height 768
+'''
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gui
+
+
+ALGORITHMS = ('DDA', 'FixedDDA', 'BLA', 'BLA2', 'circle', 'ellipse')
+
+
+class BenchWindow(gui.Window):
+    '''Window with a fixed screen size whose event loop is run by the
+       benchmark instead of execApp().
+    '''
+    def __init__(self, width:int, height:int) -> None:
+        self.fake_size = (width, height)
+        super().__init__()
+
+    def initApp(self) -> None:
+        super().initApp()
+        self.WINDOW_W, self.WINDOW_H = self.fake_size
+
+    def execApp(self) -> None:
+        self.win.show()
+        while self.LOCKED:
+            self.app.processEvents()
+        self.app.processEvents()
+
+
+def percentile(values:list, q:float) -> float:
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def points(algorithm:str, w:int, h:int) -> list:
+    '''This function picks the points clicked to draw a shape which
+       spans most of a grid of w x h pixels.
+    '''
+    if algorithm in ('DDA', 'FixedDDA', 'BLA', 'BLA2'):
+        return [(w // 8, h // 8), (7 * w // 8, 5 * h // 8)]
+    elif algorithm == 'circle':
+        return [(w // 2, h // 2), (w // 2, h // 2 - h // 3)]
+    return [(w // 2, h // 2), (w // 2, h // 2 - h // 3),
+            (w // 2 + w // 4, h // 2)]
+
+
+def click(window:BenchWindow, x:int, y:int) -> None:
+    if gui.GRID_MODE == 'canvas':
+        window.canvas.clicked.emit(x, y)
+    else:
+        window.pixel_matrix[window.pixelIndex(x, y)].click()
+
+
+def session(window:BenchWindow, algorithm:str) -> dict:
+    '''This function replays drawing one shape step by step and then
+       with playSimulation().
+
+       ⦿ Output:
+            1. a dict of timings in mS.
+    '''
+    app = window.app
+    {'DDA' : window.DDA, 'FixedDDA' : window.fixedDDA, 'BLA' : window.BLA,
+     'BLA2' : window.BLA2, 'circle' : window.circle,
+     'ellipse' : window.ellipse}[algorithm]()
+    shape = points(algorithm, window.RESOLUTION_W, window.RESOLUTION_H)
+
+    start = time.perf_counter()
+    clicks = []
+    for x, y in shape:
+        t = time.perf_counter()
+        click(window, x, y)
+        app.processEvents()
+        clicks.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    window.next()
+    app.processEvents()
+    start_time = time.perf_counter() - t
+
+    steps = []
+    while window.STATE == 'next':
+        t = time.perf_counter()
+        window.next()
+        app.processEvents()
+        steps.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    window.next()
+    app.processEvents()
+    clear_time = time.perf_counter() - t
+    total = time.perf_counter() - start
+
+    for x, y in shape:
+        click(window, x, y)
+    window.INTERVAL = 0
+    t = time.perf_counter()
+    window.playSimulation()
+    while window.play_timer.isActive():
+        app.processEvents()
+    play_time = time.perf_counter() - t
+    window.next()
+    app.processEvents()
+
+    return {'pixels' : window.pixel_count,
+            'click_ms' : 1000 * max(clicks),
+            'start_ms' : 1000 * start_time,
+            'step_p50_ms' : 1000 * percentile(steps, 0.50),
+            'step_p90_ms' : 1000 * percentile(steps, 0.90),
+            'step_p99_ms' : 1000 * percentile(steps, 0.99),
+            'step_max_ms' : 1000 * max(steps),
+            'clear_ms' : 1000 * clear_time,
+            'session_ms' : 1000 * total,
+            'play_ms' : 1000 * play_time}
+
+
+def main(argv:list = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the GUI under '
+                                     'the offscreen Qt platform.')
+    parser.add_argument('--modes', nargs='+', choices=('canvas', 'buttons'),
+                        default=('canvas', 'buttons'))
+    parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS,
+                        default=ALGORITHMS)
+    parser.add_argument('--width', type=int, default=1920,
+                        help='width of the fake screen')
+    parser.add_argument('--height', type=int, default=1080,
+                        help='height of the fake screen')
+    parser.add_argument('--output', help='file to save the results to')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode in args.modes:
+        gui.GRID_MODE = mode
+        t = time.perf_counter()
+        window = BenchWindow(args.width, args.height)
+        build = time.perf_counter() - t
+        print(f'{mode}: {window.RESOLUTION_W} x {window.RESOLUTION_H} grid '
+              f'built in {1000 * build:.1f} mS', flush=True)
+        results[mode] = {'grid' : [window.RESOLUTION_W, window.RESOLUTION_H],
+                         'build_ms' : 1000 * build}
+
+        for algorithm in args.algorithms:
+            r = session(window, algorithm)
+            results[mode][algorithm] = r
+            print(f'  {algorithm:<8} {r["pixels"]:>6} pixels  step p50 '
+                  f'{r["step_p50_ms"]:.3f} p90 {r["step_p90_ms"]:.3f} '
+                  f'p99 {r["step_p99_ms"]:.3f} max {r["step_max_ms"]:.3f}  '
+                  f'clear {r["clear_ms"]:.2f}  session '
+                  f'{r["session_ms"]:.0f}  play {r["play_ms"]:.0f} mS',
+                  flush=True)
+
+        window.win.close()
+        window.win.deleteLater()
+        window.app.processEvents()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'screen' : [args.width, args.height],
+                       'results' : results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
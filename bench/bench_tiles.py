@@ -0,0 +1,104 @@
+'''Benchmark of the tiled rasterization of large scenes.
+
+   A scene of random lines, circles and ellipses is drawn on a canvas
+   by TiledRenderer.renderSerial() and then by render() with each of
+   the given numbers of workers. Every canvas is checked to be the same
+   as the serial one, byte for byte, and the speed-up over the serial
+   path is reported.
+
+   ⦿ Usage:
+        python bench/bench_tiles.py
+        python bench/bench_tiles.py --width 10000 --height 10000 --shapes 20000
+        python bench/bench_tiles.py --workers 1 2 4 8 --tile 256
+'''
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algo.tiles import TiledRenderer
+
+
+def scene(count:int, width:int, height:int, size:int, seed:int) -> list:
+    '''This function makes a scene of random shapes, some of which
+       stick out of the canvas.
+
+       ⦿ Output:
+            1. a list of tuples of an algorithm and its arguments.
+    '''
+    rand = random.Random(seed)
+    shapes = []
+    for i in range(count):
+        algorithm = rand.choice(('DDA', 'FixedDDA', 'BLA', 'circle',
+                                'ellipse'))
+        x = rand.randrange(-size // 4, width + size // 4)
+        y = rand.randrange(-size // 4, height + size // 4)
+        if algorithm in ('DDA', 'FixedDDA', 'BLA'):
+            shapes.append((algorithm, x, y, x + rand.randrange(-size, size),
+                           y + rand.randrange(-size, size)))
+        elif algorithm == 'circle':
+            shapes.append((algorithm, x, y, rand.randrange(size // 2)))
+        else:
+            shapes.append((algorithm, x, y, rand.randrange(size // 2),
+                           rand.randrange(size // 2)))
+    return shapes
+
+
+def main(argv:list = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the tiled '
+                                     'rasterization of large scenes.')
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=4000)
+    parser.add_argument('--shapes', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=1000,
+                        help='largest line length or diameter')
+    parser.add_argument('--tile', type=int, default=512)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, os.cpu_count()}),
+                        help='numbers of workers to run with')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to save the results to')
+    args = parser.parse_args(argv)
+
+    shapes = scene(args.shapes, args.width, args.height, args.size,
+                   args.seed)
+    renderer = TiledRenderer(args.width, args.height, args.tile, 0)
+    start = time.perf_counter()
+    serial = renderer.renderSerial(shapes)
+    serial_time = time.perf_counter() - start
+    jobs = renderer.tiles(shapes)
+    print(f'{args.shapes} shapes on {args.width} x {args.height}: '
+          f'{serial.count(1)} cells set, {len(jobs)} tiles busy, '
+          f'serial {serial_time:.2f} s', flush=True)
+
+    results = {'serial_s' : serial_time}
+    mismatches = 0
+    for workers in args.workers:
+        with TiledRenderer(args.width, args.height, args.tile,
+                           workers) as renderer:
+            renderer.render(shapes[:1])
+            start = time.perf_counter()
+            canvas = renderer.render(shapes)
+            elapsed = time.perf_counter() - start
+        same = canvas == serial
+        mismatches += not same
+        results[f'workers={workers}'] = {'seconds' : elapsed,
+                                         'speedup' : serial_time / elapsed,
+                                         'identical' : same}
+        print(f'{workers:>3} workers {elapsed:8.2f} s  speed-up '
+              f'{serial_time / elapsed:5.2f}  '
+              f'{"identical" if same else "MISMATCH"}', flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'cpus' : os.cpu_count(), 'results' : results}, f,
+                      indent=2)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
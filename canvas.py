@@ -0,0 +1,127 @@
+from PyQt5.QtGui import QBrush, QColor, QImage, QPainter, QPixmap
+from PyQt5.QtWidgets import QToolTip, QWidget
+from PyQt5.QtCore import QEvent, QRect, Qt, pyqtSignal
+
+from vars import BUTTON_HOVER, DARK
+
+
+class Canvas(QWidget):
+    '''Single widget painting the whole pixel grid.
+       Each cell of the grid is one pixel of a QImage which gets
+       scaled up by the pixel size while painting, so clicks and
+       hovers are mapped to cells arithmetically and only the cells
+       that changed are repainted.
+
+       ⦿ Input:
+            1. columns    = number of cells along x
+            2. rows       = number of cells along y
+            3. pixel_size = side of each cell on screen
+    '''
+    clicked = pyqtSignal(int, int)
+
+    def __init__(self, columns:int, rows:int, pixel_size:int) -> None:
+        super().__init__()
+        self._columns = columns
+        self._rows = rows
+        self._pixel_size = pixel_size
+
+        self._cells = QImage(columns, rows, QImage.Format_ARGB32)
+        self._cells.fill(Qt.transparent)
+        self._colors = {None : QColor(Qt.transparent).rgba()}
+        self._tile = self._createTile()
+
+        self.setFixedSize(columns * pixel_size, rows * pixel_size)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def _createTile(self) -> QPixmap:
+        '''This function draws a blank cell, which is repeated over
+           the canvas wherever no colour is set.
+        '''
+        tile = QPixmap(self._pixel_size, self._pixel_size)
+        tile.fill(QColor(BUTTON_HOVER))
+        painter = QPainter(tile)
+        painter.fillRect(1, 1, self._pixel_size - 2, self._pixel_size - 2,
+                         QColor(DARK))
+        painter.end()
+        return tile
+
+    def cellAt(self, px:int, py:int) -> tuple[int, int]:
+        '''This function maps a position on the widget to a cell.
+
+           ⦿ Output:
+                1. x and y of the cell, or None if the position lies
+                   outside the grid.
+        '''
+        x = px // self._pixel_size
+        y = py // self._pixel_size
+        if 0 <= x < self._columns and 0 <= y < self._rows:
+            return x, y
+        return None
+
+    def setCell(self, x:int, y:int, color:str) -> None:
+        '''Colour a single cell and schedule a repaint of only that
+           cell. A color of None restores the blank cell.
+        '''
+        if color not in self._colors:
+            self._colors[color] = QColor(color).rgba()
+        self._cells.setPixel(x, y, self._colors[color])
+        self.update(x * self._pixel_size, y * self._pixel_size,
+                    self._pixel_size, self._pixel_size)
+
+    def fillSpan(self, x:int, y:int, length:int, color:str) -> None:
+        '''Colour a run of cells of a row at once and schedule a repaint
+           of only that run. A color of None restores the blank cells.
+        '''
+        self.fillRect(x, y, length, 1, color)
+
+    def fillRect(self, x:int, y:int, width:int, height:int,
+                 color:str) -> None:
+        '''Colour a rectangle of cells at once, like a run of a row or
+           of a column, and schedule a repaint of only that rectangle.
+           A color of None restores the blank cells.
+        '''
+        if color not in self._colors:
+            self._colors[color] = QColor(color).rgba()
+        painter = QPainter(self._cells)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(x, y, width, height,
+                         QColor.fromRgba(self._colors[color]))
+        painter.end()
+        self.update(x * self._pixel_size, y * self._pixel_size,
+                    width * self._pixel_size, height * self._pixel_size)
+
+    def clear(self) -> None:
+        self._cells.fill(Qt.transparent)
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        rect = event.rect()
+        x1 = rect.left() // self._pixel_size
+        y1 = rect.top() // self._pixel_size
+        x2 = min(rect.right() // self._pixel_size, self._columns - 1)
+        y2 = min(rect.bottom() // self._pixel_size, self._rows - 1)
+        source = QRect(x1, y1, x2 - x1 + 1, y2 - y1 + 1)
+        target = QRect(x1 * self._pixel_size, y1 * self._pixel_size,
+                       source.width() * self._pixel_size,
+                       source.height() * self._pixel_size)
+
+        painter = QPainter(self)
+        painter.fillRect(target, QBrush(self._tile))
+        painter.drawImage(target, self._cells, source)
+        painter.end()
+
+    def mousePressEvent(self, event) -> None:
+        cell = self.cellAt(event.x(), event.y())
+        if event.button() == Qt.LeftButton and cell is not None:
+            self.clicked.emit(*cell)
+
+    def event(self, event) -> bool:
+        if event.type() == QEvent.ToolTip:
+            cell = self.cellAt(event.x(), event.y())
+            if cell is None:
+                QToolTip.hideText()
+            else:
+                QToolTip.showText(event.globalPos(),
+                                  f'x = {cell[0]}\ny = {cell[1]}', self)
+            return True
+        return super().event(event)
@@ -1,15 +1,19 @@
 import sys
+import time
+from itertools import islice
 
 from PyQt5.QtGui import QCursor, QIcon, QKeySequence, QPixmap
 from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QLabel,\
  QSlider, QHBoxLayout, QVBoxLayout, QGridLayout, QShortcut
-from PyQt5.QtCore import Qt
-from PyQt5.QtTest import QTest
-
-from algo.bla import BLA
-from algo.dda import DDA
-from algo.circle import Circle
-from algo.ellipse import Ellipse
+from PyQt5.QtCore import Qt, QTimer
+
+from algo.bla import BLA, DoubleStepBLA
+from algo.cache import ShapeCache
+from algo.clip import inside
+from algo.dda import DDA, FixedDDA
+from algo.fill import CircleFill, EllipseFill, FloodFill, spanBox
+from algo.scene import Scene
+from canvas import Canvas
 from vars import *
 
 
@@ -28,20 +32,29 @@ class Window(object):
                                   between DDA and BLA
             9.  dda_btn         : Button to choose Digital Differential
                                   Analyzer algorithm
+                fixed_dda_btn   : Button to choose the fixed-point
+                                  Digital Differential Analyzer
             10. bla_btn         : Button to choose Bresenham's Line
                                   Algorithm
+                bla2_btn        : Button to choose the double-step
+                                  Bresenham's Line Algorithm
             11. circle_btn      : Button to choose mid-point circle
                                   drawing algorithm
             12. ellipse_btn     : Button to choose mid-point ellipse
                                   drawing algorithm
             13. grid            : The canvas for drawing line
             14. pixel_matrix    : Array of buttons simulating pixels
+                                  (GRID_MODE = 'buttons')
+                canvas          : Single widget painting all the
+                                  pixels (GRID_MODE = 'canvas')
             15. pt_lbl          : To display points and/or radii
                                   selected by user
             16. param_lbl       : To display the parameters including
                                   pixel locations for each iteration
             17. pixel_lbl       : To display number of pixels to be
-                                  highlighted
+                                  highlighted and of steps taken
+                timing_lbl      : To display the time taken by the hot
+                                  paths (when timed)
             18. interval_lbl    : To manipulate the simulation interval
             19. interval_slider : To change the simulation interval
             20. interval_value  : To view current simulation interval
@@ -49,8 +62,24 @@ class Window(object):
                                   well as to start the simulation and
                                   clear the grid
     '''
-    def __init__(self) -> None:
+    def __init__(self, startup_profile:list = None,
+                 timings = None) -> None:
+        '''⦿ Input:
+                1. startup_profile = list of (phase, seconds) timed
+                                     before the window, like imports.
+                                     When given, the time taken by each
+                                     phase of building the window is
+                                     added and all of it is printed
+                                     once the grid is ready.
+                2. timings         = algo.timing.Timings to record the
+                                     time taken by the hot paths into.
+                                     When given, they are also shown
+                                     next to pixel_lbl.
+        '''
         super().__init__()
+        self.startup_profile = startup_profile
+        self.timings = timings
+        self.phase_start = time.perf_counter()
         self.createGUI()
         self.execApp()
 
@@ -58,31 +87,61 @@ class Window(object):
         '''Call to all the functions for building and initializing GUI
         '''
         self.initVars()
+        self.initTimings()
         self.initApp()
         self.initWindow()
         self.initShortcuts()
+        self.initSimulation()
+        self.markPhase('application')
 
         self.createTitleBar()
         self.createIcon()
         self.createTitle()
         self.createMinimize()
         self.createClose()
+        self.markPhase('titlebar')
 
         self.createAlgoBar()
         self.createDDA()
+        self.createFixedDDA()
         self.createBLA()
+        self.createBLA2()
         self.createCircle()
         self.createEllipse()
+        self.markPhase('algobar')
 
         self.createGrid()
-        self.createPixels()
+        if GRID_MODE == 'canvas':
+            self.createCanvas()
+        else:
+            self.createPixels()
+        self.markPhase('grid')
 
         self.createParaBar()
         self.createPointLabel()
         self.createParamLabel()
         self.createPixelsLabel()
+        self.createTimingLabel()
         self.createIntervalLabel()
         self.createNext()
+        self.markPhase('parabar')
+
+    def markPhase(self, phase:str) -> None:
+        '''Record the time taken since the previous phase of startup
+           when profiling it.
+        '''
+        now = time.perf_counter()
+        if self.startup_profile is not None:
+            self.startup_profile.append((phase, now - self.phase_start))
+        self.phase_start = now
+
+    def printStartupProfile(self) -> None:
+        if self.startup_profile is None:
+            return
+        for phase, seconds in self.startup_profile:
+            print(f'{phase:<20}{seconds * 1000:10.1f} mS')
+        total = sum(seconds for phase, seconds in self.startup_profile)
+        print(f'{"total":<20}{total * 1000:10.1f} mS', flush=True)
 
     def initVars(self):
         '''Initialize variables -
@@ -92,14 +151,59 @@ class Window(object):
            3. INDEX      : Iteration index. (Default : 0)
            4. INTERVAL   : Time interval between each iteration in
                            simulation. (100 mS)
+           5. LOCKED     : Whether clicks on the grid are ignored.
+                           (Default : False)
+           6. dirty_pixels : Indices of the pixels which are not in
+                             their resting style : their style.
+           7. shape_cache  : Pixels of the shapes drawn so far, reused
+                             when a shape is drawn again anywhere.
+           8. play_clock   : When the simulation last advanced, to find
+                             how many steps are due on each tick.
+           9. dirty_spans  : Runs (x, y, length) of pixels filled since
+                             the last reset.
+           10. scene       : The completed shapes, which stay on the
+                             grid until removed.
+           11. selected    : Key in the scene of the selected shape.
+                             (Default : None)
+           12. dirty_runs  : Runs (x, y, width, height) of pixels of a
+                             line which are not in their resting style :
+                             their style.
         '''  
         self.ALGORITHM = 'DDA'
         self.STATE = 'select pt1'
         self.INDEX = 0
         self.INTERVAL = INTERVAL
+        self.LOCKED = False
+        self.dirty_pixels = {}
+        self.shape_cache = ShapeCache(SHAPE_CACHE_BYTES)
+        self.play_clock = 0.0
+        self.dirty_spans = []
+        self.scene = Scene(self.shape_cache)
+        self.selected = None
+        self.dirty_runs = {}
+
+    def initTimings(self) -> None:
+        '''Time the hot paths when timings are given: computing the
+           pixels of a shape, looking it up in the shape cache, applying
+           a style to a pixel and clearing the grid. Each transition of
+           next() is timed by next() itself, as methods connected to
+           signals cannot be wrapped.
+        '''
+        if self.timings is None:
+            return
+
+        from algo.circle import Circle
+        from algo.ellipse import Ellipse
+
+        for algoclass in (DDA, FixedDDA, BLA, DoubleStepBLA, Circle, Ellipse):
+            self.timings.instrument(algoclass, 'getPixels', 'getTrace')
+        self.timings.instrument(self.shape_cache, 'get', 'peek')
+        self.timings.instrument(self.scene, 'add', 'remove', 'move', 'at')
+        self.timings.instrument(self, 'setPixelStyle', 'setSpanStyle',
+                                'setRunStyle', 'resetPixels', 'advance')
 
     def initApp(self):
-        self.app = QApplication(sys.argv)        
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.WINDOW_H = self.app.desktop().availableGeometry().height()
         self.WINDOW_W = self.app.desktop().availableGeometry().width()
 
@@ -121,19 +225,33 @@ class Window(object):
            Instantiation QShortcut and bind them to the window.
            ⦿ Keyboard shortcuts are as follows:
                 1. B     =  Select BLA
+                   W     =  Select double-step BLA
                 2. D     =  Select DDA
+                   I     =  Select fixed-point DDA
                 3. C     =  Select Circle
                 4. E     =  Select Ellipse
                 5. Enter =  Click START/NEXT/CLEAR
-                6. Space =  Play simulation
-                7. Q     =  Close window
+                6. Space =  Play/pause simulation
+                7. Esc   =  Stop simulation and clear the grid, or
+                            remove all the shapes when not drawing one
+                8. F     =  Fill the completed circle or ellipse
+                9. Del   =  Remove the selected shape
+                10. Arrows = Move the selected shape
+                11. Ctrl+S = Save the grid as a PNG image
+                12. Q    =  Close window
         '''
         QShortcut(QKeySequence("B"), self.win).activated.connect(
             self.BLA
         )
+        QShortcut(QKeySequence("W"), self.win).activated.connect(
+            self.BLA2
+        )
         QShortcut(QKeySequence("D"), self.win).activated.connect(
             self.DDA
         )
+        QShortcut(QKeySequence("I"), self.win).activated.connect(
+            self.fixedDDA
+        )
         QShortcut(QKeySequence("C"), self.win).activated.connect(
             self.circle
         )
@@ -146,12 +264,48 @@ class Window(object):
         QShortcut(QKeySequence("Space"), self.win).activated.connect(
             self.playSimulation
         )
+        QShortcut(QKeySequence("Escape"), self.win).activated.connect(
+            self.stopSimulation
+        )
+        QShortcut(QKeySequence("F"), self.win).activated.connect(
+            self.fillShape
+        )
+        QShortcut(QKeySequence("Delete"), self.win).activated.connect(
+            self.removeShape
+        )
+        QShortcut(QKeySequence("Left"), self.win).activated.connect(
+            lambda: self.moveShape(-1, 0)
+        )
+        QShortcut(QKeySequence("Right"), self.win).activated.connect(
+            lambda: self.moveShape(1, 0)
+        )
+        QShortcut(QKeySequence("Up"), self.win).activated.connect(
+            lambda: self.moveShape(0, -1)
+        )
+        QShortcut(QKeySequence("Down"), self.win).activated.connect(
+            lambda: self.moveShape(0, 1)
+        )
+        QShortcut(QKeySequence("Ctrl+S"), self.win).activated.connect(
+            self.exportGrid
+        )
         QShortcut(QKeySequence("Q"), self.win).activated.connect(
             self.win.close
         )
 
+    def initSimulation(self) -> None:
+        '''Create the timer playing the simulation from the event loop,
+           so that the window stays responsive and the simulation can be
+           paused or stopped.
+        '''
+        self.play_timer = QTimer()
+        self.play_timer.setTimerType(Qt.PreciseTimer)
+        self.play_timer.timeout.connect(self.playStep)
+
     def execApp(self) -> None:
         self.win.show()
+        self.markPhase('show')
+        if GRID_MODE == 'canvas':
+            self.printStartupProfile()
         sys.exit(self.app.exec_())
 
 
@@ -224,7 +378,30 @@ class Window(object):
         self.ALGORITHM = 'DDA'
 
         self.dda_btn.setStyleSheet(SELECTED_STYLE)
+        self.fixed_dda_btn.setStyleSheet(DESELECTED_STYLE)
         self.bla_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla2_btn.setStyleSheet(DESELECTED_STYLE)
+        self.circle_btn.setStyleSheet(DESELECTED_STYLE)
+        self.ellipse_btn.setStyleSheet(DESELECTED_STYLE)
+
+        self.pt_lbl.setText(POINT_LABEL_TXT_LINE)
+        self.param_lbl.setText(PARAM_LABEL_TXT_DDA)
+
+    def createFixedDDA(self) -> None:
+        self.fixed_dda_btn = QPushButton()
+        self.fixed_dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.fixed_dda_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        self.fixed_dda_btn.setText('Fixed DDA Line')
+        self.fixed_dda_btn.clicked.connect(self.fixedDDA)
+        self.algobar_hlayout.addWidget(self.fixed_dda_btn)
+
+    def fixedDDA(self) -> None:
+        self.ALGORITHM = 'FixedDDA'
+
+        self.fixed_dda_btn.setStyleSheet(SELECTED_STYLE)
+        self.dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla2_btn.setStyleSheet(DESELECTED_STYLE)
         self.circle_btn.setStyleSheet(DESELECTED_STYLE)
         self.ellipse_btn.setStyleSheet(DESELECTED_STYLE)
 
@@ -244,6 +421,29 @@ class Window(object):
 
         self.bla_btn.setStyleSheet(SELECTED_STYLE)
         self.dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.fixed_dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla2_btn.setStyleSheet(DESELECTED_STYLE)
+        self.circle_btn.setStyleSheet(DESELECTED_STYLE)
+        self.ellipse_btn.setStyleSheet(DESELECTED_STYLE)
+
+        self.pt_lbl.setText(POINT_LABEL_TXT_LINE)
+        self.param_lbl.setText(PARAM_LABEL_TXT_BLA)
+
+    def createBLA2(self) -> None:
+        self.bla2_btn = QPushButton()
+        self.bla2_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla2_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        self.bla2_btn.setText('BLA ×2 Line')
+        self.bla2_btn.clicked.connect(self.BLA2)
+        self.algobar_hlayout.addWidget(self.bla2_btn)
+
+    def BLA2(self) -> None:
+        self.ALGORITHM = 'BLA2'
+
+        self.bla2_btn.setStyleSheet(SELECTED_STYLE)
+        self.dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.fixed_dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla_btn.setStyleSheet(DESELECTED_STYLE)
         self.circle_btn.setStyleSheet(DESELECTED_STYLE)
         self.ellipse_btn.setStyleSheet(DESELECTED_STYLE)
 
@@ -263,7 +463,9 @@ class Window(object):
 
         self.circle_btn.setStyleSheet(SELECTED_STYLE)
         self.dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.fixed_dda_btn.setStyleSheet(DESELECTED_STYLE)
         self.bla_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla2_btn.setStyleSheet(DESELECTED_STYLE)
         self.ellipse_btn.setStyleSheet(DESELECTED_STYLE)
 
         self.pt_lbl.setText(POINT_LABEL_TXT_CIRCLE)
@@ -282,7 +484,9 @@ class Window(object):
 
         self.ellipse_btn.setStyleSheet(SELECTED_STYLE)
         self.dda_btn.setStyleSheet(DESELECTED_STYLE)
+        self.fixed_dda_btn.setStyleSheet(DESELECTED_STYLE)
         self.bla_btn.setStyleSheet(DESELECTED_STYLE)
+        self.bla2_btn.setStyleSheet(DESELECTED_STYLE)
         self.circle_btn.setStyleSheet(DESELECTED_STYLE)
 
         self.pt_lbl.setText(POINT_LABEL_TXT_ELLIPSE)
@@ -304,40 +508,236 @@ class Window(object):
         self.RESOLUTION_H = ((self.WINDOW_H - TITLEBAR_H) * 11 // 15 - 20)\
                             // PIXEL_SIZE
         self.RESOLUTION_W = (self.WINDOW_W - 50) // PIXEL_SIZE
+        self.viewport = (0, 0, self.RESOLUTION_W - 1, self.RESOLUTION_H - 1)
 
     def createPixels(self) -> None:
-        self.pixel_matrix = [QPushButton() 
-                             for i in range(self.RESOLUTION_H * 
-                                            self.RESOLUTION_W)]
-
-        for i in range(self.RESOLUTION_H * self.RESOLUTION_W):
-            self.pixel_matrix[i].setMinimumWidth(PIXEL_SIZE)
-            self.pixel_matrix[i].setMaximumWidth(PIXEL_SIZE)
-            self.pixel_matrix[i].setMinimumHeight(PIXEL_SIZE)
-            self.pixel_matrix[i].setMaximumHeight(PIXEL_SIZE)
-
-            y = i % self.RESOLUTION_H
-            x = i // self.RESOLUTION_H
-
-            self.pixel_matrix[i].setStyleSheet(PIXEL_STYLE)
-            self.pixel_matrix[i].clicked.connect(self.pixelClick)
-            self.pixel_matrix[i].setToolTip(f'x = {x}\ny = {y}')
-            self.grid_layout.addWidget(self.pixel_matrix[i], y, x, 1, 1)
+        '''Create the pixel buttons a slice at a time from the event
+           loop, so that the window shows up without waiting for
+           thousands of buttons. The grid stays hidden, which also
+           saves laying it out again after every slice, and ignores
+           clicks until all of them are created.
+        '''
+        self.pixel_matrix = []
+        self.pixel_coords = {}
+        self.LOCKED = True
+        self.grid.setVisible(False)
+        QTimer.singleShot(0, self.buildPixels)
+
+    def buildPixels(self) -> None:
+        '''Create pixel buttons for GRID_BUILD_SLICE mS and schedule
+           the next slice, if any.
+        '''
+        deadline = time.perf_counter() + GRID_BUILD_SLICE / 1000
+        total = self.RESOLUTION_H * self.RESOLUTION_W
+        i = len(self.pixel_matrix)
+
+        while i < total and time.perf_counter() < deadline:
+            pixel = QPushButton()
+            pixel.setMinimumWidth(PIXEL_SIZE)
+            pixel.setMaximumWidth(PIXEL_SIZE)
+            pixel.setMinimumHeight(PIXEL_SIZE)
+            pixel.setMaximumHeight(PIXEL_SIZE)
+
+            x, y = self.pixelCoords(i)
+            self.pixel_coords[pixel] = (x, y)
+
+            pixel.setStyleSheet(PIXEL_STYLE)
+            pixel.clicked.connect(self.pixelClick)
+            pixel.setToolTip(f'x = {x}\ny = {y}')
+            self.grid_layout.addWidget(pixel, y, x, 1, 1)
+            self.pixel_matrix.append(pixel)
+            i += 1
+
+        if i < total:
+            QTimer.singleShot(0, self.buildPixels)
+        else:
+            self.grid.setVisible(True)
+            self.LOCKED = False
+            self.markPhase('pixels')
+            self.printStartupProfile()
+
+    def createCanvas(self) -> None:
+        self.canvas = Canvas(self.RESOLUTION_W, self.RESOLUTION_H, PIXEL_SIZE)
+        self.canvas.setStyleSheet(CANVAS_STYLE)
+        self.canvas.clicked.connect(self.selectPixel)
+        self.grid_layout.addWidget(self.canvas, 0, 0, 1, 1)
+
+    def pixelIndex(self, x:int, y:int) -> int:
+        '''Map grid co-ordinates to the index of the pixel in the
+           column-major pixel matrix. Shapes are clipped to the
+           viewport, so the co-ordinates are always inside the grid.
+        '''
+        return x * self.RESOLUTION_H + y
+
+    def pixelCoords(self, i:int) -> tuple[int, int]:
+        '''Map the index of a pixel in the pixel matrix back to its
+           grid co-ordinates.
+        '''
+        return i // self.RESOLUTION_H, i % self.RESOLUTION_H
+
+    def runIndices(self, x:int, y:int, width:int, height:int) -> range:
+        '''Map a run of pixels of a row or of a column to the indices
+           of its pixels in the pixel matrix.
+        '''
+        if width == 1:
+            return range(self.pixelIndex(x, y), self.pixelIndex(x, y + height))
+        return range(self.pixelIndex(x, y), self.pixelIndex(x + width, y),
+                     self.RESOLUTION_H)
+
+    def inDirtyRun(self, x:int, y:int) -> bool:
+        return any(rx <= x < rx + width and ry <= y < ry + height
+                   for rx, ry, width, height in self.dirty_runs)
+
+    def plotCoords(self, pixloc:tuple) -> tuple[int, int]:
+        '''Pick the plotted co-ordinates out of one entry of pixel_set.
+           DDA keeps them after the unrounded x and y.
+        '''
+        if self.ALGORITHM in ('DDA', 'FixedDDA'):
+            return pixloc[2], pixloc[3]
+        return pixloc[0], pixloc[1]
+
+    def setPixelStyle(self, x:int, y:int, style:str) -> None:
+        '''Apply one of the pixel styles to the pixel at (x, y) of the
+           grid, whether the grid is made of buttons or is a canvas.
+        '''
+        i = self.pixelIndex(x, y)
+        if GRID_MODE == 'canvas':
+            self.canvas.setCell(*self.pixelCoords(i), CANVAS_COLORS[style])
+        else:
+            self.pixel_matrix[i].setStyleSheet(style)
+
+        if style == self.restingStyle(x, y) and not self.inDirtyRun(x, y):
+            self.dirty_pixels.pop(i, None)
+        else:
+            self.dirty_pixels[i] = style
+
+    def restingStyle(self, x:int, y:int, width:int = 1,
+                     height:int = 1) -> str:
+        '''Style the pixel at (x, y), or the run of width and height
+           from it, is restored to: that of a completed shape if the
+           scene covers all of it, the default one if it covers none of
+           it, else None.
+        '''
+        if width == height == 1:
+            covered = self.scene.covers(x, y)
+        else:
+            covered = self.scene.coverage((x, y, x + width - 1,
+                                           y + height - 1))
+        if covered == width * height:
+            return COMPLETED_LINE_STYLE
+        if not covered:
+            return PIXEL_STYLE
+        return None
+
+    def setSpanStyle(self, x:int, y:int, length:int, style:str) -> None:
+        '''Apply one of the pixel styles to a run of pixels of a row.
+           The canvas colours the run in one go, while the buttons have
+           to be styled one by one.
+        '''
+        if GRID_MODE == 'canvas':
+            self.canvas.fillSpan(x, y, length, CANVAS_COLORS[style])
+        else:
+            for i in range(self.pixelIndex(x, y),
+                           self.pixelIndex(x + length, y),
+                           self.RESOLUTION_H):
+                self.pixel_matrix[i].setStyleSheet(style)
+        self.dirty_spans.append((x, y, length))
+
+    def setRunStyle(self, line, style:str) -> None:
+        '''Apply one of the pixel styles to the pixels of a BLA line a
+           run at a time. The canvas colours each run as one rectangle,
+           while the buttons have to be styled one by one. Each run is
+           kept dirty as a whole, over the pixels styled before in it.
+        '''
+        for start, length, fixed in line.iterRuns():
+            if line.horizontal:
+                run = (start, fixed, length, 1)
+            else:
+                run = (fixed, start, 1, length)
+            indices = self.runIndices(*run)
+            if GRID_MODE == 'canvas':
+                self.canvas.fillRect(*run, CANVAS_COLORS[style])
+            else:
+                for i in indices:
+                    self.pixel_matrix[i].setStyleSheet(style)
+
+            for i in self.dirty_pixels.keys() & indices:
+                del self.dirty_pixels[i]
+            self.dirty_runs.pop(run, None)
+            if style != self.restingStyle(*run):
+                self.dirty_runs[run] = style
+
+    def resetPixels(self) -> None:
+        '''Restore the resting style of only the pixels which have
+           been changed since the last reset. The shapes of the scene
+           under the spans are drawn again once the spans are blank.
+        '''
+        for x, y, length in self.dirty_spans:
+            if GRID_MODE == 'canvas':
+                self.canvas.fillSpan(x, y, length, None)
+            else:
+                for i in range(self.pixelIndex(x, y),
+                               self.pixelIndex(x + length, y),
+                               self.RESOLUTION_H):
+                    self.pixel_matrix[i].setStyleSheet(PIXEL_STYLE)
+        self.redrawScene(spanBox(self.dirty_spans))
+        self.dirty_spans.clear()
+
+        # Runs partly under the scene are restored a pixel at a time.
+        for run in self.dirty_runs:
+            style = self.restingStyle(*run)
+            if style is None:
+                self.dirty_pixels.update(dict.fromkeys(self.runIndices(*run)))
+            elif GRID_MODE == 'canvas':
+                self.canvas.fillRect(*run, CANVAS_COLORS[style])
+            else:
+                for i in self.runIndices(*run):
+                    self.pixel_matrix[i].setStyleSheet(style)
+        self.dirty_runs.clear()
+
+        for i in self.dirty_pixels:
+            style = self.restingStyle(*self.pixelCoords(i))
+            if GRID_MODE == 'canvas':
+                self.canvas.setCell(*self.pixelCoords(i), CANVAS_COLORS[style])
+            else:
+                self.pixel_matrix[i].setStyleSheet(style)
+        self.dirty_pixels.clear()
+
+    def redrawScene(self, box:tuple) -> None:
+        '''Draw again the pixels of the shapes of the scene inside box,
+           if any.
+        '''
+        if box is not None:
+            for x, y in self.scene.pixelsIn(box):
+                self.setPixelStyle(x, y, COMPLETED_LINE_STYLE)
     
     def pixelClick(self) -> None:
-        pxl = self.grid.sender()
-        i = self.pixel_matrix.index(pxl)
+        x, y = self.pixel_coords[self.grid.sender()]
+        self.selectPixel(x, y)
 
-        y = i % self.RESOLUTION_H
-        x = i // self.RESOLUTION_H
+    def selectPixel(self, x:int, y:int) -> None:
+        '''State machine for selecting the points of the shape. Once
+           the shape is completed, a click flood fills the region
+           around the pixel instead.
+        '''
+        if self.STATE == 'clear':
+            self.floodFill(x, y)
+            return
+        if self.LOCKED:
+            return
+
+        if self.STATE == 'select pt1' and \
+           QApplication.keyboardModifiers() & Qt.ShiftModifier:
+            self.selectShape(x, y)
 
-        if self.STATE == 'select pt1':
-            self.pixel_matrix[i].setStyleSheet(POINT_PIXEL_STYLE)
+        elif self.STATE == 'select pt1':
+            self.deselectShape()
+            self.setPixelStyle(x, y, POINT_PIXEL_STYLE)
 
             self.x1 = x
             self.y1 = y
 
-            if self.ALGORITHM in ('DDA', 'BLA'): 
+            if self.ALGORITHM in ('DDA', 'FixedDDA', 'BLA', 'BLA2'): 
                 self.pt_lbl.setText(f'x1 = {self.x1}\ny1 = {self.y1}\n\
                                     \nx2 = -\ny2 = -')
             elif self.ALGORITHM == 'circle':
@@ -352,8 +752,8 @@ class Window(object):
         elif self.STATE == 'select pt2':
             self.algobar.setDisabled(True)
 
-            if self.ALGORITHM in ('DDA', 'BLA'):
-                self.pixel_matrix[i].setStyleSheet(POINT_PIXEL_STYLE)
+            if self.ALGORITHM in ('DDA', 'FixedDDA', 'BLA', 'BLA2'):
+                self.setPixelStyle(x, y, POINT_PIXEL_STYLE)
 
                 self.x2 = x
                 self.y2 = y
@@ -361,8 +761,7 @@ class Window(object):
                 self.pt_lbl.setText(f'x1 = {self.x1}\ny1 = {self.y1}\n\
                                      \nx2 = {self.x2}\ny2 = {self.y2}')
 
-                for pixel in self.pixel_matrix:
-                    pixel.setDisabled(True)
+                self.LOCKED = True
 
                 self.next_btn.setDisabled(False)
                 self.next_btn.setStyleSheet(SELECTED_STYLE)
@@ -371,7 +770,7 @@ class Window(object):
 
             elif self.ALGORITHM == 'circle':
                 if x == self.x1:
-                    self.pixel_matrix[i].setStyleSheet(POINT_PIXEL_STYLE)
+                    self.setPixelStyle(x, y, POINT_PIXEL_STYLE)
 
                     self.x2 = x
                     self.y2 = y
@@ -380,8 +779,7 @@ class Window(object):
                     self.pt_lbl.setText(f'x = {self.x1}\ny = {self.y1}\n\
                                     \nr = {self.r}')
 
-                    for pixel in self.pixel_matrix:
-                        pixel.setDisabled(True)
+                    self.LOCKED = True
 
                     self.next_btn.setDisabled(False)
                     self.next_btn.setStyleSheet(SELECTED_STYLE)
@@ -390,7 +788,7 @@ class Window(object):
 
             elif self.ALGORITHM == 'ellipse':
                 if x == self.x1:
-                    self.pixel_matrix[i].setStyleSheet(POINT_PIXEL_STYLE)
+                    self.setPixelStyle(x, y, POINT_PIXEL_STYLE)
 
                     self.x2 = x
                     self.y2 = y
@@ -404,7 +802,7 @@ class Window(object):
         elif self.STATE == 'select pt3':
             if self.ALGORITHM == 'ellipse':
                 if y == self.y1:
-                    self.pixel_matrix[i].setStyleSheet(POINT_PIXEL_STYLE)
+                    self.setPixelStyle(x, y, POINT_PIXEL_STYLE)
 
                     self.x3 = x
                     self.y3 = y
@@ -413,8 +811,7 @@ class Window(object):
                     self.pt_lbl.setText(f'x = {self.x1}\ny = {self.y1}\n\
                                     \naxis along x = {self.a}\naxis along y = {self.b}')
 
-                    for pixel in self.pixel_matrix:
-                        pixel.setDisabled(True)
+                    self.LOCKED = True
 
                     self.next_btn.setDisabled(False)
                     self.next_btn.setStyleSheet(SELECTED_STYLE)
@@ -422,6 +819,137 @@ class Window(object):
                     self.STATE = 'start'
 
 
+    def selectShape(self, x:int, y:int) -> None:
+        '''Select the latest drawn of the shapes having a pixel at
+           (x, y) and highlight it. Clicking where there is none
+           deselects the selected shape.
+        '''
+        self.deselectShape()
+        keys = self.scene.at(x, y)
+        if keys:
+            self.selected = keys[0]
+            self.styleShape(self.scene.pixels(self.selected),
+                            LINE_PIXEL_STYLE)
+
+    def deselectShape(self) -> None:
+        if self.selected is not None:
+            self.styleShape(self.scene.pixels(self.selected),
+                            COMPLETED_LINE_STYLE)
+            self.selected = None
+
+    def removeShape(self) -> None:
+        '''Remove the selected shape from the scene, redrawing only the
+           pixels it covered.
+        '''
+        if self.selected is None:
+            return
+        footprint = self.scene.remove(self.selected)
+        self.selected = None
+        self.styleShape(footprint)
+
+    def moveShape(self, dx:int, dy:int) -> None:
+        '''Move the selected shape by dx and dy, redrawing only the
+           pixels it covered before, with the shapes and fills under
+           them, and the ones it covers now.
+        '''
+        if self.selected is None:
+            return
+        before, after = self.scene.move(self.selected, dx, dy)
+        self.styleShape(before - after)
+        self.styleShape(after, LINE_PIXEL_STYLE)
+
+    def clearScene(self) -> None:
+        '''Remove all the shapes of the scene from the grid.
+        '''
+        pixels = self.scene.pixelsIn(self.viewport)
+        self.scene.clear()
+        self.selected = None
+        self.styleShape(pixels)
+
+    def styleShape(self, pixels, style:str = None) -> None:
+        '''Apply a style to the pixels of a shape lying on the grid, or
+           draw again what lies under them if no style is given: the
+           shapes of the scene, else the fills, else the resting style.
+        '''
+        filled = set() if style else self.filledPixels(pixels)
+        for x, y in pixels:
+            if not inside(x, y, self.viewport):
+                continue
+            if style:
+                self.setPixelStyle(x, y, style)
+            elif (x, y) in filled and not self.scene.covers(x, y):
+                self.setPixelStyle(x, y, FILL_PIXEL_STYLE)
+            else:
+                self.setPixelStyle(x, y, self.restingStyle(x, y))
+
+    def filledPixels(self, pixels) -> set:
+        '''Find which of the pixels lie in the spans filled since the
+           last reset.
+        '''
+        rows = {}
+        for x, y, length in self.dirty_spans:
+            rows.setdefault(y, []).append((x, x + length))
+        return {(x, y) for x, y in pixels
+                if any(start <= x < stop for start, stop in rows.get(y, ()))}
+
+    def floodFill(self, x:int, y:int) -> None:
+        '''Fill the region of blank pixels around (x, y), which stops
+           at the pixels of the shapes and at the edges of the grid.
+        '''
+        blocked = lambda x, y: self.pixelIndex(x, y) in self.dirty_pixels \
+                               or self.scene.covers(x, y) \
+                               or self.inDirtyRun(x, y)
+        for span in FloodFill(x, y, blocked, self.viewport).getSpans():
+            self.setSpanStyle(*span, FILL_PIXEL_STYLE)
+
+    def fillShape(self) -> None:
+        '''Fill the completed circle or ellipse with its scanline fill,
+           keeping the shapes of the scene in sight.
+        '''
+        if self.STATE != 'clear' or self.ALGORITHM not in ('circle', 'ellipse'):
+            return
+        if self.ALGORITHM == 'circle':
+            spans = CircleFill(self.x1, self.y1, self.r, clip=self.viewport)
+        else:
+            spans = EllipseFill(self.x1, self.y1, self.a + 1, self.b,
+                                clip=self.viewport)
+        spans = spans.getSpans()
+        for span in spans:
+            self.setSpanStyle(*span, FILL_PIXEL_STYLE)
+        self.redrawScene(spanBox(spans))
+        # The centre is filled over, unless a shape passes through it.
+        if not self.scene.covers(self.x1, self.y1):
+            self.setPixelStyle(self.x1, self.y1, FILL_PIXEL_STYLE)
+
+    def exportGrid(self) -> None:
+        '''Save the grid as a PNG image of one pixel per cell, in the
+           colours of the canvas, named after the time by EXPORT_FILE.
+           The fills go first, then the shapes of the scene and then
+           the pixels styled since, as they are painted on the grid.
+        '''
+        from algo.framebuffer import Framebuffer, palette
+
+        colors = [DARK]
+        for color in CANVAS_COLORS.values():
+            if color is not None and color not in colors:
+                colors.append(color)
+        index = {style : 0 if color is None else colors.index(color)
+                 for style, color in CANVAS_COLORS.items()}
+
+        framebuffer = Framebuffer(self.RESOLUTION_W, self.RESOLUTION_H)
+        framebuffer.fillSpans(self.dirty_spans, index[FILL_PIXEL_STYLE])
+        for x, y in self.scene.pixelsIn(self.viewport):
+            framebuffer[framebuffer.index(x, y)] = index[COMPLETED_LINE_STYLE]
+        for (x, y, width, height), style in self.dirty_runs.items():
+            framebuffer.fillSpans(((x, y + j, width) for j in range(height)),
+                                  index[style])
+        for i, style in self.dirty_pixels.items():
+            framebuffer[framebuffer.index(*self.pixelCoords(i))] = index[style]
+
+        path = time.strftime(EXPORT_FILE)
+        framebuffer.writePNG(path, palette(*colors))
+        self.pixel_lbl.setText(f'Saved {path}')
+
     def createParaBar(self):
         self.parabar = QWidget()
         self.parabar.setStyleSheet(PARABAR_STYLE)
@@ -454,6 +982,29 @@ class Window(object):
         self.pixel_lbl.setText(PIXEL_LABEL_TXT)
         self.parabar_hlayout.addWidget(self.pixel_lbl)
 
+    def createTimingLabel(self) -> None:
+        '''Create the label showing the timings of the hot paths, which
+           is refreshed every TIMING_REFRESH mS rather than on every
+           step so that it does not add to what it measures.
+        '''
+        if self.timings is None:
+            return
+
+        self.timing_lbl = QLabel()
+        self.timing_lbl.setStyleSheet(TIMING_LABEL_STYLE)
+        self.timing_lbl.setAlignment(Qt.AlignCenter)
+        self.timing_lbl.setText(TIMING_LABEL_TXT)
+        self.parabar_hlayout.addWidget(self.timing_lbl)
+
+        self.timing_timer = QTimer(self.timing_lbl)
+        self.timing_timer.timeout.connect(self.showTimings)
+        self.timing_timer.start(TIMING_REFRESH)
+
+    def showTimings(self) -> None:
+        if len(self.timings):
+            self.timing_lbl.setText('min / mean / p95 mS\n\n' +
+                                    self.timings.format(TIMING_LABEL_ROWS))
+
     def createIntervalLabel(self) -> None:
         self.interval_lbl = QWidget()
         self.interval_lbl.setMaximumWidth(200)
@@ -484,6 +1035,9 @@ class Window(object):
         self.INTERVAL = self.interval_slider.value()
         self.interval_value.setText(f'Simulation Interval :' +\
                                     f' {self.interval_slider.value()} mS')
+        if self.play_timer.isActive():
+            self.play_clock = time.perf_counter()
+            self.play_timer.setInterval(max(self.INTERVAL, FRAME_INTERVAL))
 
     def createNext(self) -> None:
         self.next_btn = QPushButton()
@@ -495,121 +1049,48 @@ class Window(object):
         self.parabar_hlayout.addWidget(self.next_btn)
 
     def next(self) -> None:
-        if self.STATE == 'start':
-            if self.ALGORITHM == 'DDA':
-                algoclass = DDA(self.x1, self.y1, self.x2, self.y2)
-                self.pixel_set = algoclass.getPixels()
-
-                x = self.pixel_set[self.INDEX][0]
-                y = self.pixel_set[self.INDEX][1]
-                xplot = self.pixel_set[self.INDEX][2]
-                yplot = self.pixel_set[self.INDEX][3]
-
-                self.param_lbl.setText(f'x = {x}\ny = {y}\n\
-                                        \nx-plot = {xplot}\ny-plot = {yplot}')
-
-            elif self.ALGORITHM == 'BLA':
-                algoclass = BLA(self.x1, self.y1, self.x2, self.y2)
-                self.pixel_set = algoclass.getPixels()
+        state = self.STATE
+        start = time.perf_counter()
 
-                xplot = self.pixel_set[self.INDEX][0]
-                yplot = self.pixel_set[self.INDEX][1]
-                p = self.pixel_set[self.INDEX][2]
-
-                self.param_lbl.setText(f'p = {p}\n\
-                                        \nx-plot = {xplot}\ny-plot = {yplot}')
-
-            elif self.ALGORITHM == 'circle':
-                algoclass = Circle(self.x1, self.y1, self.r)
-                self.pixel_set = algoclass.getPixels()
-
-                xplot = self.pixel_set[self.INDEX][0]
-                yplot = self.pixel_set[self.INDEX][1]
-                p = self.pixel_set[self.INDEX][2]
-
-                self.param_lbl.setText(f'p = {p}\n\
-                                        \nx-plot = {xplot}\ny-plot = {yplot}')
-
-            elif self.ALGORITHM == 'ellipse':
-                algoclass = Ellipse(self.x1, self.y1, self.a + 1, self.b)
-                self.pixel_set = algoclass.getPixels()
-
-                xplot = self.pixel_set[self.INDEX][0]
-                yplot = self.pixel_set[self.INDEX][1]
-                p = self.pixel_set[self.INDEX][2]
-
-                self.param_lbl.setText(f'p = {p}\n\
-                                        \nx-plot = {xplot}\ny-plot = {yplot}')
-
-            i = (xplot*self.RESOLUTION_H + yplot) % len(self.pixel_matrix)
-            self.pixel_matrix[i].setStyleSheet(LINE_PIXEL_STYLE)
-            self.INDEX += 1
-            self.pixel_lbl.setText(f'Pixels to be highlighted =' +\
-                                    f' {len(self.pixel_set) - self.INDEX}')
+        if self.STATE == 'start':
+            # A shape not drawn before is computed a step at a time as
+            # it is shown, and cached once it is complete.
+            self.pixel_set = self.shape_cache.peek(self.ALGORITHM,
+                                                   *self.shapeArgs(),
+                                                   clip=self.viewport)
+            if self.pixel_set is None:
+                self.pixel_set = self.shapeAlgorithm()
+            self.pixel_iter = iter(self.pixel_set)
+            self.pixel_count = len(self.pixel_set)
             self.next_btn.setText('NEXT')
 
             self.STATE = 'next'
+            self.advance()
 
         elif self.STATE == 'next':
-            if self.ALGORITHM == 'DDA':
-                x = self.pixel_set[self.INDEX][0]
-                y = self.pixel_set[self.INDEX][1]
-                xplot = self.pixel_set[self.INDEX][2]
-                yplot = self.pixel_set[self.INDEX][3]
-
-                self.param_lbl.setText(f'x = {x}\ny = {y}\n\
-                                        \nx-plot = {xplot}\ny-plot = {yplot}')
-
-            elif self.ALGORITHM in ('BLA', 'circle', 'ellipse'):
-                xplot = self.pixel_set[self.INDEX][0]
-                yplot = self.pixel_set[self.INDEX][1]
-                p = self.pixel_set[self.INDEX][2]
-
-                self.param_lbl.setText(f'p = {p}\n\
-                                        \nx-plot = {xplot}\ny-plot = {yplot}')  
-
-            i = (xplot*self.RESOLUTION_H + yplot) % len(self.pixel_matrix)
-            self.pixel_matrix[i].setStyleSheet(LINE_PIXEL_STYLE)
-            self.INDEX += 1
-            self.pixel_lbl.setText(f'Pixels to be highlighted =' +\
-                                    f' {len(self.pixel_set) - self.INDEX}')
-
-            if self.INDEX == len(self.pixel_set):
-                for pixloc in self.pixel_set:
-                    if self.ALGORITHM == 'DDA':
-                        i = (pixloc[2] * self.RESOLUTION_H + pixloc[3])\
-                            % len(self.pixel_matrix)
-                    else:
-                        i = (pixloc[0] *self.RESOLUTION_H + pixloc[1])\
-                            % len(self.pixel_matrix)
-                    self.pixel_matrix[i].setStyleSheet(COMPLETED_LINE_STYLE)
-
-                self.next_btn.setText('CLEAR')
-                self.next_btn.setStyleSheet(ALERT_STYLE)
-
-                self.STATE = 'clear'
+            self.advance()
 
         elif self.STATE == 'clear':
+            self.play_timer.stop()
             self.algobar.setDisabled(False)
             self.INDEX = 0
 
-            if self.ALGORITHM in ('DDA', 'BLA'):
+            if self.ALGORITHM in ('DDA', 'FixedDDA', 'BLA', 'BLA2'):
                 self.pt_lbl.setText(POINT_LABEL_TXT_LINE)
             elif self.ALGORITHM == 'circle':
                 self.pt_lbl.setText(POINT_LABEL_TXT_CIRCLE)
             elif self.ALGORITHM == 'ellipse':
                 self.pt_lbl.setText(POINT_LABEL_TXT_ELLIPSE)
 
-            if self.ALGORITHM == 'DDA':
+            if self.ALGORITHM in ('DDA', 'FixedDDA'):
                 self.param_lbl.setText(PARAM_LABEL_TXT_DDA)
             else:
                 self.param_lbl.setText(PARAM_LABEL_TXT_BLA)
 
-            self.pixel_lbl.setText(f'Pixels to be highlighted = -')
+            self.pixel_lbl.setText(PIXEL_LABEL_TXT)
 
-            for pixel in self.pixel_matrix:
-                pixel.setStyleSheet(PIXEL_STYLE)
-                pixel.setDisabled(False)
+            self.resetPixels()
+            self.LOCKED = False
 
             self.next_btn.setText('START')
             self.next_btn.setDisabled(True)
@@ -617,8 +1098,153 @@ class Window(object):
 
             self.STATE = 'select pt1'
 
-    def playSimulation(self):
+        if self.timings is not None and state in ('start', 'next', 'clear'):
+            self.timings.record(f'next ({state})',
+                                time.perf_counter() - start)
+
+    def advance(self, count:int = 1, deadline:float = None) -> None:
+        '''Highlight the pixels of the next count steps of the shape, or
+           of as many of them as there is time for before the deadline
+           (a value of time.perf_counter()), and complete the shape
+           after its last pixel, or at once if none of it is visible.
+           A step is one pixel, or up to DoubleStepBLA.STEP pixels for
+           the double-step BLA. Only the parameters of the last pixel
+           are shown, and Qt merges the repaints of all the pixels into
+           one, so many pixels can be highlighted at the cost of about
+           one frame.
+        '''
+        step = self.stepSize()
+        pixloc = None
+        for pixloc in islice(self.pixel_iter, count * step):
+            self.setPixelStyle(*self.plotCoords(pixloc), LINE_PIXEL_STYLE)
+            self.INDEX += 1
+            if self.INDEX % step and self.INDEX != self.pixel_count:
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+        if pixloc is not None and self.ALGORITHM in ('DDA', 'FixedDDA'):
+            x, y, xplot, yplot = pixloc
+            if self.ALGORITHM == 'FixedDDA':
+                # The steps of FixedDDA lines are in fixed point, turned
+                # into floats only here, for the last pixel shown.
+                dda = FixedDDA(*self.shapeArgs())
+                x = dda.value(x)
+                y = dda.value(y)
+
+            self.param_lbl.setText(f'x = {x}\ny = {y}\n\
+                                    \nx-plot = {xplot}\ny-plot = {yplot}')
+
+        elif pixloc is not None:
+            xplot, yplot, p = pixloc
+
+            self.param_lbl.setText(f'p = {p}\n\
+                                    \nx-plot = {xplot}\ny-plot = {yplot}')
+
+        self.pixel_lbl.setText(f'Pixels to be highlighted =' +\
+                                f' {self.pixel_count - self.INDEX}\n' +\
+                                f'\nSteps taken = {-(-self.INDEX // step)}')
+
+        if self.INDEX == self.pixel_count:
+            self.pixel_set = self.shape_cache.get(self.ALGORITHM,
+                                                  *self.shapeArgs(),
+                                                  clip=self.viewport)
+            # The double-step BLA draws the pixels of BLA, so its lines
+            # join the scene as BLA lines.
+            self.scene.add('BLA' if self.ALGORITHM == 'BLA2' else
+                           self.ALGORITHM, *self.shapeArgs(),
+                           clip=self.viewport)
+            if self.ALGORITHM in ('BLA', 'BLA2'):
+                self.setRunStyle(BLA(*self.shapeArgs(), clip=self.viewport),
+                                 COMPLETED_LINE_STYLE)
+            else:
+                for pixloc in self.pixel_set:
+                    self.setPixelStyle(*self.plotCoords(pixloc),
+                                       COMPLETED_LINE_STYLE)
+
+            self.next_btn.setText('CLEAR')
+            self.next_btn.setStyleSheet(ALERT_STYLE)
+
+            self.STATE = 'clear'
+
+    def stepSize(self) -> int:
+        '''Number of pixels each step of the selected algorithm
+           highlights, the last step highlighting those left.
+        '''
+        if self.ALGORITHM == 'BLA2':
+            return DoubleStepBLA.STEP
+        return 1
+
+    def shapeArgs(self) -> tuple:
+        '''Arguments of the class of the selected algorithm for the
+           points selected by the user.
+        '''
+        if self.ALGORITHM in ('DDA', 'FixedDDA', 'BLA', 'BLA2'):
+            return self.x1, self.y1, self.x2, self.y2
+        elif self.ALGORITHM == 'circle':
+            return self.x1, self.y1, self.r
+        return self.x1, self.y1, self.a + 1, self.b
+
+    def shapeAlgorithm(self):
+        '''Instance of the class of the selected algorithm for the
+           points selected by the user, clipped to the viewport, whose
+           steps are computed as it is iterated.
+        '''
+        from algo.circle import Circle
+        from algo.ellipse import Ellipse
+
+        algoclass = {'DDA' : DDA, 'FixedDDA' : FixedDDA, 'BLA' : BLA,
+                     'BLA2' : DoubleStepBLA, 'circle' : Circle,
+                     'ellipse' : Ellipse}[self.ALGORITHM]
+        return algoclass(*self.shapeArgs(), clip=self.viewport)
+
+    def playSimulation(self) -> None:
+        '''Play the simulation, or pause it if it is playing. It can be
+           resumed from where it was paused or stepped through with
+           NEXT meanwhile.
+        '''
+        if self.play_timer.isActive():
+            self.play_timer.stop()
+            return
+
         if self.STATE == 'start':
-            while self.STATE != 'clear':
-                self.next()
-                QTest.qWait(self.INTERVAL)
\ No newline at end of file
+            self.next()
+        if self.STATE == 'next':
+            self.play_clock = time.perf_counter()
+            self.play_timer.start(max(self.INTERVAL, FRAME_INTERVAL))
+
+    def stopSimulation(self) -> None:
+        '''Stop the simulation, playing or not, and clear the grid. When
+           no shape is being drawn, remove all the shapes instead.
+        '''
+        self.play_timer.stop()
+        if self.STATE in ('next', 'clear'):
+            self.STATE = 'clear'
+            self.next()
+        elif self.STATE == 'select pt1' and not self.LOCKED:
+            self.clearScene()
+
+    def playStep(self) -> None:
+        '''Advance the simulation on a tick of play_timer. The timer
+           ticks at most once a frame; when the interval is shorter
+           than a frame, all the steps due since the last tick are taken
+           at once, within PLAY_BUDGET mS so that the window keeps
+           painting and taking input. An interval of 0 mS takes as many
+           steps as fit in the budget.
+        '''
+        if self.STATE != 'next':
+            self.play_timer.stop()
+            return
+
+        now = time.perf_counter()
+        if self.INTERVAL >= FRAME_INTERVAL:
+            count = 1
+        elif self.INTERVAL == 0:
+            count = self.pixel_count - self.INDEX
+        else:
+            count = int((now - self.play_clock) * 1000 // self.INTERVAL)
+            self.play_clock += count * self.INTERVAL / 1000
+        self.advance(count, now + PLAY_BUDGET / 1000)
+
+        if self.STATE != 'next':
+            self.play_timer.stop()
\ No newline at end of file
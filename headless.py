@@ -0,0 +1,289 @@
+'''Rasterize shapes without the GUI.
+
+   Shapes are read one per line from a JSONL or CSV file (or stdin) and
+   their pixels are streamed out as JSONL, CSV or binary records while
+   they are being computed, so memory stays bounded however many shapes
+   or pixels there are. Throughput is reported on stderr. With --clip,
+   only the pixels inside a viewport are computed and written.
+   With --image, the shapes are drawn into a framebuffer of --size
+   cells instead, which is saved as a PNG, PPM or PGM image (or as raw
+   bytes) by the extension of the file. --workers draws it in tiles on
+   a pool of processes. With --canvas, the shapes are drawn a shape at
+   a time into a memory-mapped canvas file instead, new of --size cells
+   or else the one the file holds, for grids larger than memory which
+   viewer.py shows.
+
+   ⦿ Shapes:
+        JSONL : {"shape": "line-dda", "x1": 0, "y1": 0, "x2": 9, "y2": 4}
+                {"shape": "line-dda-fixed", "x1": 0, "y1": 0, "x2": 9, "y2": 4}
+                {"shape": "line-bla", "x1": 0, "y1": 0, "x2": 9, "y2": 4}
+                {"shape": "circle", "x": 0, "y": 0, "r": 5}
+                {"shape": "ellipse", "x": 0, "y": 0, "a": 7, "b": 3}
+        CSV   : the shape followed by the same values in that order,
+                like line-bla,0,0,9,4 or circle,0,0,5
+
+   ⦿ Records, one per pixel:
+        jsonl  : {"id": 0, "x": 1, "y": 2}
+        csv    : id,x,y
+        binary : id, x and y as little-endian signed 32 bit integers
+'''
+import argparse
+import csv
+import json
+import sys
+import time
+from array import array
+
+from algo.bla import BLA
+from algo.dda import DDA, FixedDDA
+from algo.circle import Circle
+from algo.ellipse import Ellipse
+from algo.framebuffer import Framebuffer
+from algo.mmapcanvas import MappedCanvas
+from algo.tiles import TiledRenderer
+
+
+# Class, names of its arguments and position of x-plot in its steps.
+SHAPES = {'line-dda'       : (DDA, ('x1', 'y1', 'x2', 'y2'), 2),
+          'line-dda-fixed' : (FixedDDA, ('x1', 'y1', 'x2', 'y2'), 2),
+          'line-bla'       : (BLA, ('x1', 'y1', 'x2', 'y2'), 0),
+          'circle'         : (Circle, ('x', 'y', 'r'), 0),
+          'ellipse'        : (Ellipse, ('x', 'y', 'a', 'b'), 0)}
+# Name of the algorithm of each shape in the algo package.
+ALGORITHMS = {'line-dda' : 'DDA', 'line-dda-fixed' : 'FixedDDA',
+              'line-bla' : 'BLA', 'circle' : 'circle', 'ellipse' : 'ellipse'}
+CHUNK = 4096
+
+
+def readShapes(stream, fmt:str):
+    '''This function parses the shapes of the input lazily and checks
+       them, so the functions drawing them need not. A shape which cannot
+       be parsed raises a ValueError naming its line.
+
+       ⦿ Output:
+            1. tuples of shape name and its integer arguments.
+    '''
+    if fmt == 'csv':
+        reader = csv.reader(stream)
+        for row in reader:
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                shape, values = row[0], row[1:]
+                args = checkShape(shape, values)
+            except (TypeError, ValueError) as error:
+                raise ValueError(f'line {reader.line_num}: {error}') from None
+            yield shape, args
+    else:
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+                shape = spec.get('shape') if isinstance(spec, dict) else None
+                names = SHAPES[shape][1] if shape in SHAPES else ()
+                args = checkShape(shape, [spec[n] for n in names if n in spec])
+            except (TypeError, ValueError) as error:
+                raise ValueError(f'line {number}: {error}') from None
+            yield shape, args
+
+
+def checkShape(shape:str, values:list) -> tuple:
+    '''This function checks the shape name and its values, which must
+       be integers or strings of integers, and returns them as integers.
+    '''
+    if shape not in SHAPES:
+        raise ValueError(f'unknown shape {shape!r}, expected one of '
+                         f'{", ".join(SHAPES)}')
+    names = SHAPES[shape][1]
+    if len(values) != len(names):
+        raise ValueError(f'{shape} needs {", ".join(names)}')
+    args = []
+    for name, value in zip(names, values):
+        try:
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError
+            args.append(int(value))
+        except ValueError:
+            raise ValueError(f'{name} of {shape} must be an integer, '
+                             f'not {value!r}') from None
+    return tuple(args)
+
+
+def pixels(shape:str, args:tuple, clip:tuple = None):
+    '''This function yields plotted x and y of each pixel of a shape
+       as readShapes yields it, or of the ones inside the viewport clip
+       if given.
+    '''
+    algoclass, names, k = SHAPES[shape]
+    for step in algoclass(*args, clip=clip):
+        yield step[k], step[k + 1]
+
+
+def render(shapes, width:int, height:int, workers:int = 0) -> Framebuffer:
+    '''This function draws shapes into a framebuffer, in tiles on a
+       pool of that many workers if workers is not 0.
+    '''
+    specs = [(ALGORITHMS[shape], *args) for shape, args in shapes]
+
+    framebuffer = Framebuffer(width, height)
+    if workers:
+        with TiledRenderer(width, height, workers=workers) as renderer:
+            renderer.render(specs, framebuffer)
+    else:
+        framebuffer.drawShapes(specs)
+    return framebuffer
+
+
+def writeJSONL(out, shape_id:int, chunk:list) -> None:
+    out.write(''.join(f'{{"id": {shape_id}, "x": {x}, "y": {y}}}\n'
+                      for x, y in chunk))
+
+
+def writeCSV(out, shape_id:int, chunk:list) -> None:
+    out.write(''.join(f'{shape_id},{x},{y}\n' for x, y in chunk))
+
+
+def writeBinary(out, shape_id:int, chunk:list) -> None:
+    records = array('i')
+    for x, y in chunk:
+        records.extend((shape_id, x, y))
+    if sys.byteorder == 'big':
+        records.byteswap()
+    out.write(records.tobytes())
+
+
+WRITERS = {'jsonl' : writeJSONL, 'csv' : writeCSV, 'binary' : writeBinary}
+
+
+def saveImage(args, src, in_fmt:str) -> int:
+    start = time.perf_counter()
+    try:
+        shapes = list(readShapes(src, in_fmt))
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    framebuffer = render(shapes, *args.size, args.workers)
+    drawn = time.perf_counter()
+    framebuffer.save(args.image)
+
+    if not args.quiet:
+        cells = len(framebuffer) - framebuffer.count(0)
+        print(f'{len(shapes)} shapes, {cells} cells set in '
+              f'{drawn - start:.3f} s, saved in '
+              f'{time.perf_counter() - drawn:.3f} s', file=sys.stderr)
+    return 0
+
+
+def drawCanvas(args, src, in_fmt:str) -> int:
+    start = time.perf_counter()
+    shape_count = 0
+    size = args.size or (None, None)
+    try:
+        with MappedCanvas(args.canvas, *size) as canvas:
+            for shape, shape_args in readShapes(src, in_fmt):
+                canvas.draw(ALGORITHMS[shape], *shape_args)
+                shape_count += 1
+            tiles = canvas.allocated
+            nbytes = canvas.nbytes
+    finally:
+        if src is not sys.stdin:
+            src.close()
+
+    if not args.quiet:
+        print(f'{shape_count} shapes drawn in '
+              f'{time.perf_counter() - start:.3f} s, {tiles} tiles taking '
+              f'{nbytes / 2**20:.1f} MiB', file=sys.stderr)
+    return 0
+
+
+def writePixels(args, src, in_fmt:str) -> int:
+    if args.format == 'binary':
+        out = sys.stdout.buffer if args.output == '-' \
+              else open(args.output, 'wb')
+    else:
+        out = sys.stdout if args.output == '-' \
+              else open(args.output, 'w', newline='')
+    write = WRITERS[args.format]
+
+    shape_count = 0
+    pixel_count = 0
+    start = time.perf_counter()
+    try:
+        for shape_id, (shape, shape_args) in enumerate(readShapes(src,
+                                                                  in_fmt)):
+            chunk = []
+            for pixel in pixels(shape, shape_args, args.clip):
+                chunk.append(pixel)
+                if len(chunk) == CHUNK:
+                    write(out, shape_id, chunk)
+                    pixel_count += len(chunk)
+                    chunk = []
+            write(out, shape_id, chunk)
+            pixel_count += len(chunk)
+            shape_count += 1
+    finally:
+        out.flush()
+        if out not in (sys.stdout, sys.stdout.buffer):
+            out.close()
+        if src is not sys.stdin:
+            src.close()
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    if not args.quiet:
+        print(f'{shape_count} shapes, {pixel_count} pixels in '
+              f'{elapsed:.3f} s ({shape_count / elapsed:.0f} shapes/s, '
+              f'{pixel_count / elapsed:.0f} pixels/s)', file=sys.stderr)
+    return 0
+
+
+def main(argv:list = None) -> int:
+    parser = argparse.ArgumentParser(description='Rasterize line, circle '
+                                     'and ellipse specs without the GUI.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='JSONL or CSV file of shapes, - for stdin')
+    parser.add_argument('-o', '--output', default='-',
+                        help='file to write the pixels to, - for stdout')
+    parser.add_argument('--input-format', choices=('jsonl', 'csv'),
+                        help='defaults to csv for .csv files, else jsonl')
+    parser.add_argument('--format', choices=tuple(WRITERS), default='jsonl',
+                        help='format of the pixel records')
+    parser.add_argument('--clip', nargs=4, type=int,
+                        metavar=('XMIN', 'YMIN', 'XMAX', 'YMAX'),
+                        help='write only the pixels inside this viewport')
+    parser.add_argument('--image',
+                        help='draw the shapes into a framebuffer saved to '
+                        'this .png, .ppm, .pgm or raw file instead')
+    parser.add_argument('--canvas',
+                        help='draw the shapes into this memory-mapped '
+                        'canvas file instead, made anew if --size is given')
+    parser.add_argument('--size', nargs=2, type=int,
+                        metavar=('WIDTH', 'HEIGHT'),
+                        help='cells of the framebuffer of --image or of a '
+                        'new --canvas')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='processes drawing the --image in tiles')
+    parser.add_argument('--quiet', action='store_true',
+                        help='do not report throughput on stderr')
+    args = parser.parse_args(argv)
+    if args.image and not args.size:
+        parser.error('--image needs --size')
+    if args.image and args.canvas:
+        parser.error('--image and --canvas cannot be used together')
+
+    in_fmt = args.input_format or ('csv' if args.input.endswith('.csv')
+                                   else 'jsonl')
+    try:
+        src = sys.stdin if args.input == '-' \
+              else open(args.input, newline='')
+        if args.image:
+            return saveImage(args, src, in_fmt)
+        if args.canvas:
+            return drawCanvas(args, src, in_fmt)
+        return writePixels(args, src, in_fmt)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,72 @@
-import gui
+import sys
+import time
+
+
+USAGE = ('usage: main.py [--startup-profile] [--timings] '
+         '[--timings-json FILE] [--cprofile FILE]')
+
+
+def popOption(name:str, takes_value:bool = False):
+    '''Remove an option, and its value if it takes one, from sys.argv
+       before Qt sees them.
+
+       ⦿ Output:
+            1. the value of the option, True for a flag, or None if
+               it was not given.
+    '''
+    if name not in sys.argv:
+        return None
+    i = sys.argv.index(name)
+    if takes_value and (i + 1 == len(sys.argv) or
+                        sys.argv[i + 1].startswith('--')):
+        print(f'{USAGE}\nmain.py: error: {name} needs a file name',
+              file=sys.stderr)
+        sys.exit(2)
+    value = sys.argv[i + 1] if takes_value else True
+    del sys.argv[i:i + 1 + takes_value]
+    return value
 
 
 if __name__ == "__main__":
-    window = gui.Window()
\ No newline at end of file
+    timings_json = popOption('--timings-json', takes_value=True)
+    cprofile_out = popOption('--cprofile', takes_value=True)
+
+    if popOption('--startup-profile'):
+        profile = []
+
+        start = time.perf_counter()
+        import PyQt5.QtWidgets
+        profile.append(('import PyQt5', time.perf_counter() - start))
+
+        start = time.perf_counter()
+        import algo.cache
+        profile.append(('import algo', time.perf_counter() - start))
+
+        start = time.perf_counter()
+        import gui
+        profile.append(('import gui', time.perf_counter() - start))
+    else:
+        profile = None
+        import gui
+
+    if popOption('--timings') or timings_json:
+        from algo.timing import Timings
+        timings = Timings(gui.TIMING_SAMPLES)
+    else:
+        timings = None
+
+    if cprofile_out:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        window = gui.Window(startup_profile=profile, timings=timings)
+    finally:
+        if cprofile_out:
+            profiler.disable()
+            profiler.dump_stats(cprofile_out)
+        if timings is not None:
+            timings.uninstrument()
+        if timings_json:
+            timings.dump(timings_json)
\ No newline at end of file
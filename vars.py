@@ -4,6 +4,7 @@ DARK2 = '#1c1c1c'
 BUTTON_HOVER = '#202020'
 HIGHLIGHT = '#00ad37'
 POINT = '#ff6600'
+FILL = '#0a4d20'
 
 #window
 WINDOW_TITLE = 'Graphixo'
@@ -65,8 +66,17 @@ ALERT_STYLE = f'* {{\
                   }}'
 
 #grid
+GRID_MODE = 'canvas'            # 'canvas' or 'buttons'
 PIXEL_SIZE = 10
+GRID_BUILD_SLICE = 15           # mS spent creating pixel buttons per turn
 INTERVAL = 100
+FRAME_INTERVAL = 16             # mS of a display frame
+PLAY_BUDGET = 12                # mS of simulation steps per frame
+SHAPE_CACHE_BYTES = 64 * 1024 * 1024
+TIMING_SAMPLES = 256            # latest durations kept per timed section
+TIMING_REFRESH = 500            # mS between updates of the timing label
+TIMING_LABEL_ROWS = 5           # slowest sections shown by the label
+EXPORT_FILE = 'grid_%Y%m%d_%H%M%S.png'  # strftime() name of saved grids
 GRID_STYLE = f'background : {DARK};'
 PIXEL_STYLE = f'* {{\
                   background    : {DARK};\
@@ -111,6 +121,29 @@ COMPLETED_LINE_STYLE = f'* {{\
                            border-radius : 5px;\
                            padding       : 5px;\
                            }}'
+FILL_PIXEL_STYLE = f'* {{\
+                        background    : {FILL};\
+                        border        : 0px;\
+                        }}\
+                     QToolTip {{\
+                        color         : {HIGHLIGHT};\
+                        background    : {DARK};\
+                        font-weight   : bold;\
+                        border-radius : 5px;\
+                        padding       : 5px;\
+                        }}'
+CANVAS_STYLE = f'QToolTip {{\
+                   color         : {HIGHLIGHT};\
+                   background    : {DARK};\
+                   font-weight   : bold;\
+                   border-radius : 5px;\
+                   padding       : 5px;\
+                   }}'
+CANVAS_COLORS = {PIXEL_STYLE          : None,
+                 POINT_PIXEL_STYLE    : POINT,
+                 LINE_PIXEL_STYLE     : HIGHLIGHT,
+                 COMPLETED_LINE_STYLE : POINT,
+                 FILL_PIXEL_STYLE     : FILL}
 
 #parabar
 PARABAR_STYLE = f'background : {DARK};'
@@ -121,6 +154,7 @@ LABEL_STYLE = f'* {{\
                   background    : {DARK2};\
                   border-radius : 10px;\
                   }}'
+TIMING_LABEL_STYLE = LABEL_STYLE.replace('13px', '11px')
 SLIDER_STYLE = f'QSlider::groove:horizontal {{\
                                              height        : 10px;\
                                              background    : {DARK};\
@@ -136,5 +170,6 @@ POINT_LABEL_TXT_CIRCLE = 'x = -\ny = -\n\nr = -'
 POINT_LABEL_TXT_ELLIPSE = 'x = -\ny = -\n\nradius along x = -\nradius along y = -'
 PARAM_LABEL_TXT_DDA = 'x = -\ny = -\n\nx-plot = -\ny-plot = -'
 PARAM_LABEL_TXT_BLA = 'p = -\n\nx-plot = -\ny-plot = -'
-PIXEL_LABEL_TXT = 'Pixels to be highlighted = -'
+PIXEL_LABEL_TXT = 'Pixels to be highlighted = -\n\nSteps taken = -'
+TIMING_LABEL_TXT = 'min / mean / p95 mS\n\n-'
 COORDS_LABEL_TXT = 'x = -\n\ny = -'
\ No newline at end of file
@@ -0,0 +1,111 @@
+'''Viewer of canvas files drawn by headless.py --canvas, however large.
+
+   Only the cells on screen are read from the file, through
+   MappedCanvas.window(), every time the view is painted, so scrolling
+   over a 200k x 200k canvas pages in a screenful of tiles at a time.
+
+   ⦿ Usage:
+        python viewer.py grid.canvas
+        python viewer.py grid.canvas --scale 4
+'''
+import argparse
+import sys
+
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QAbstractScrollArea, QApplication
+from PyQt5.QtCore import QRect, Qt
+
+from algo.mmapcanvas import MappedCanvas
+from vars import DARK, FILL, HIGHLIGHT, POINT, WINDOW_TITLE
+
+
+# Colour of each palette index, the last one being used for the rest.
+VIEWER_COLORS = (DARK, POINT, HIGHLIGHT, FILL)
+
+
+class CanvasView(QAbstractScrollArea):
+    '''Scrollable view of a MappedCanvas, each cell being scale pixels
+       wide on screen.
+
+       ⦿ Input:
+            1. canvas = MappedCanvas to show
+            2. scale  = side of each cell on screen
+    '''
+    def __init__(self, canvas:MappedCanvas, scale:int = 1) -> None:
+        super().__init__()
+        self._canvas = canvas
+        self._scale = scale
+        colors = [QColor(c).rgb() for c in VIEWER_COLORS]
+        self._color_table = colors + colors[-1:] * (256 - len(colors))
+        self.viewport().setAttribute(Qt.WA_OpaquePaintEvent)
+        self.horizontalScrollBar().setSingleStep(16 * scale)
+        self.verticalScrollBar().setSingleStep(16 * scale)
+
+    def _updateScrollBars(self) -> None:
+        size = self.viewport().size()
+        for bar, cells, page in ((self.horizontalScrollBar(),
+                                  self._canvas.width, size.width()),
+                                 (self.verticalScrollBar(),
+                                  self._canvas.height, size.height())):
+            bar.setPageStep(page)
+            bar.setRange(0, max(cells * self._scale - page, 0))
+
+    def resizeEvent(self, event) -> None:
+        self._updateScrollBars()
+        super().resizeEvent(event)
+
+    def visibleBox(self) -> tuple:
+        '''This function finds the cells on screen.
+
+           ⦿ Output:
+                1. a viewport (xmin, ymin, xmax, ymax) of the cells.
+        '''
+        scale = self._scale
+        left = self.horizontalScrollBar().value()
+        top = self.verticalScrollBar().value()
+        size = self.viewport().size()
+        return (left // scale, top // scale,
+                (left + size.width() - 1) // scale,
+                (top + size.height() - 1) // scale)
+
+    def paintEvent(self, event) -> None:
+        xmin, ymin, xmax, ymax = self.visibleBox()
+        window = self._canvas.window((xmin, ymin, xmax, ymax))
+        image = QImage(window, window.width, window.height, window.width,
+                       QImage.Format_Indexed8)
+        image.setColorTable(self._color_table)
+
+        scale = self._scale
+        painter = QPainter(self.viewport())
+        painter.drawImage(QRect(xmin * scale - self.horizontalScrollBar().value(),
+                                ymin * scale - self.verticalScrollBar().value(),
+                                window.width * scale, window.height * scale),
+                          image)
+        painter.end()
+
+
+def main(argv:list = None) -> int:
+    parser = argparse.ArgumentParser(description='View a canvas file drawn '
+                                     'by headless.py --canvas.')
+    parser.add_argument('canvas', help='canvas file to view')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='side of each cell on screen')
+    args = parser.parse_args(argv)
+
+    try:
+        canvas = MappedCanvas(args.canvas)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    app = QApplication(sys.argv[:1])
+    with canvas:
+        view = CanvasView(canvas, max(args.scale, 1))
+        view.setWindowTitle(f'{WINDOW_TITLE} - {args.canvas} '
+                            f'({canvas.width} x {canvas.height})')
+        view.resize(1280, 720)
+        view.show()
+        return app.exec_()
+
+
+if __name__ == '__main__':
+    sys.exit(main())